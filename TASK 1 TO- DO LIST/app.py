@@ -1,139 +1,154 @@
 # app.py for TaskElevate Pro+
 
-from flask import Flask, render_template, request, redirect, url_for, session
-import json, os
-from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response
+import csv, io, os
 from functools import wraps
+from models import Task, dumps
+from storage import TodoRepository, PAGE_SIZE
 
 app = Flask(__name__)
 app.secret_key = 'taskelevate_secret'
 
-USER_FILE = os.path.join('data', 'users.json')
-TODO_FILE = os.path.join('data', 'todos.json')
+DB_FILE = os.path.join('data', 'taskelevate.db')
+TODO_SHARDS = 8
+repo = TodoRepository(DB_FILE, shards=TODO_SHARDS)
+repo.start_checkpointer()
 
 # ---------- Helper Functions ----------
-def load_users():
-    if os.path.exists(USER_FILE):
-        with open(USER_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_users(users):
-    with open(USER_FILE, 'w') as f:
-        json.dump(users, f, indent=4)
-
-def load_todos():
-    if os.path.exists(TODO_FILE):
-        with open(TODO_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_todos(todos):
-    with open(TODO_FILE, 'w') as f:
-        json.dump(todos, f, indent=4)
-
 def login_required(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
         if 'username' not in session:
+            if request.path.startswith('/api/'):
+                return jsonify({"error": "Login required"}), 401
             return redirect(url_for('login'))
         return f(*args, **kwargs)
     return wrapper
 
+def make_task(form):
+    return Task(
+        name=form.get("todo_name"),
+        description=form.get("todo_description", ""),
+        due=form.get("todo_due") or None,
+        priority=form.get("todo_priority", "Medium"),
+        category=form.get("todo_category", ""),
+    )
+
+def json_response(data, status=200):
+    """JSON response encoded with the Task-aware codec."""
+    return Response(dumps(data), status=status, mimetype="application/json")
+
+def batch_result(result):
+    """apply_batch() output with ids as strings, as Tasks are encoded."""
+    return dict(result, deleted=[str(i) for i in result["deleted"]],
+                missing=[str(i) for i in result["missing"]])
+
 # ---------- Routes ----------
 @app.route("/")
 @login_required
 def home():
     username = session['username']
-    todos = load_todos().get(username, [])
-
-    search = request.args.get("search", "").lower()
+    search = request.args.get("search", "")
     priority = request.args.get("priority")
     category = request.args.get("category")
     sort_by = request.args.get("sort")
 
-    # Filters
-    if search:
-        todos = [t for t in todos if search in t['name'].lower() or search in t['description'].lower()]
-    if priority:
-        todos = [t for t in todos if t['priority'] == priority]
-    if category:
-        todos = [t for t in todos if t['category'] == category]
+    page = request.args.get("page", 1, type=int)
 
-    # Sorting
-    if sort_by == "priority":
-        todos.sort(key=lambda x: x['priority'])
-    elif sort_by == "due":
-        todos.sort(key=lambda x: x['due'])
-
-    done = sum(1 for t in todos if t['checked'])
-    return render_template("index.html", items=todos, completed=done, total=len(todos), user=username)
+    # Filtering, sorting and paging happen in the database; search results
+    # without an explicit sort come back ranked by relevance.
+    todos, total, done = repo.page_todos(username, search, priority, category, sort_by, page)
+    pages = max(1, -(-total // PAGE_SIZE))
+    filters = {"search": search or None, "priority": priority or None,
+               "category": category or None, "sort": sort_by or None}
+    return render_template("index.html", items=todos, completed=done, total=total, user=username,
+                           page=page, pages=pages, filters=filters)
 
 @app.route("/add", methods=["POST"])
 @login_required
 def add():
-    todos = load_todos()
-    username = session['username']
-    form = request.form
-    new_task = {
-        "id": int(datetime.now().timestamp() * 1000),
-        "name": form.get("todo_name"),
-        "description": form.get("todo_description", ""),
-        "due": form.get("todo_due", ""),
-        "priority": form.get("todo_priority", "Medium"),
-        "category": form.get("todo_category", ""),
-        "checked": False,
-        "subtasks": []
-    }
-    todos.setdefault(username, []).append(new_task)
-    save_todos(todos)
+    repo.add_todo(session['username'], make_task(request.form))
     return redirect(url_for("home"))
 
 @app.route("/toggle/<int:todo_id>", methods=["POST"])
 @login_required
 def toggle(todo_id):
-    todos = load_todos()
-    username = session['username']
-    for todo in todos.get(username, []):
-        if todo['id'] == todo_id:
-            todo['checked'] = not todo['checked']
-            break
-    save_todos(todos)
+    repo.toggle_todo(session['username'], todo_id)
     return redirect(url_for("home"))
 
 @app.route("/delete/<int:todo_id>", methods=["POST"])
 @login_required
 def delete(todo_id):
-    todos = load_todos()
-    username = session['username']
-    todos[username] = [t for t in todos.get(username, []) if t['id'] != todo_id]
-    save_todos(todos)
+    repo.delete_todo(session['username'], todo_id)
     return redirect(url_for("home"))
 
 @app.route("/edit/<int:todo_id>", methods=["POST"])
 @login_required
 def edit(todo_id):
-    todos = load_todos()
-    username = session['username']
-    for todo in todos.get(username, []):
-        if todo['id'] == todo_id:
-            todo['name'] = request.form.get("todo_name")
-            todo['description'] = request.form.get("todo_description")
-            todo['due'] = request.form.get("todo_due")
-            todo['priority'] = request.form.get("todo_priority")
-            todo['category'] = request.form.get("todo_category")
-            break
-    save_todos(todos)
+    repo.update_todo(session['username'], todo_id, {
+        "name": request.form.get("todo_name"),
+        "description": request.form.get("todo_description"),
+        "due": request.form.get("todo_due"),
+        "priority": request.form.get("todo_priority"),
+        "category": request.form.get("todo_category"),
+    })
     return redirect(url_for("home"))
 
+# ---------- JSON API ----------
+@app.route("/api/todos")
+@login_required
+def api_list():
+    page = request.args.get("page", 1, type=int)
+    todos, total, done = repo.page_todos(
+        session['username'], request.args.get("search", ""), request.args.get("priority"),
+        request.args.get("category"), request.args.get("sort"), page)
+    return json_response({"items": todos, "total": total, "completed": done,
+                          "page": page, "pages": max(1, -(-total // PAGE_SIZE))})
+
+@app.route("/api/todos/batch", methods=["POST"])
+@login_required
+def api_batch():
+    # {"ops": [{"op": "toggle", "id": 1}, {"op": "add", "task": {"name": ...}}, ...]}
+    body = request.get_json(silent=True)
+    ops = body.get("ops") if isinstance(body, dict) else None
+    if not isinstance(ops, list):
+        return jsonify({"error": "Expected a JSON body with an 'ops' list"}), 400
+    try:
+        return json_response(batch_result(repo.apply_batch(session['username'], ops)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/todos/import", methods=["POST"])
+@login_required
+def api_import():
+    # CSV with a header row: name,description,due,priority,category
+    upload = request.files.get("file")
+    try:
+        text = upload.read().decode("utf-8-sig") if upload else request.get_data(as_text=True)
+        ops = [{"op": "add", "task": Task.from_dict(dict(row, id=None, checked=False, subtasks=[]))}
+               for row in csv.DictReader(io.StringIO(text))]
+        return json_response(batch_result(repo.apply_batch(session['username'], ops)))
+    except (ValueError, csv.Error) as e:  # UnicodeDecodeError is a ValueError
+        return jsonify({"error": f"Invalid CSV: {e}"}), 400
+
+@app.route("/api/stats")
+@login_required
+def api_stats():
+    return jsonify(repo.stats(session['username']))
+
+@app.route("/api/cache-stats")
+@login_required
+def cache_stats():
+    return jsonify(repo.cache_stats())
+
 # ---------- Auth ----------
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
-        users = load_users()
         username = request.form['username']
         password = request.form['password']
-        if username in users and users[username]['password'] == password:
+        user = repo.get_user(username)
+        if user and user['password'] == password:
             session['username'] = username
             return redirect(url_for("home"))
         return "Login failed. Try again."
@@ -142,13 +157,10 @@ def login():
 @app.route("/signup", methods=["GET", "POST"])
 def signup():
     if request.method == "POST":
-        users = load_users()
         username = request.form['username']
         password = request.form['password']
-        if username in users:
+        if not repo.add_user(username, password):
             return "Username already exists."
-        users[username] = {"password": password}
-        save_users(users)
         return redirect(url_for("login"))
     return render_template("signup.html")
 
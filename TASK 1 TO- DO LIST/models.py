@@ -0,0 +1,142 @@
+# models.py for TaskElevate Pro+
+# Compact task model and JSON codecs (orjson when installed, stdlib otherwise).
+
+import json, os, sys, threading, time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+PRIORITIES = ("High", "Medium", "Low")
+
+# Task ids are Snowflake-style 63-bit integers:
+#   41 bits milliseconds since ID_EPOCH_MS | 10 bits node | 12 bits sequence
+# The node is the low bits of the pid (taken again after fork), so workers
+# started together get distinct nodes without coordination; the sequence
+# orders ids within one ms. Pids that agree in their low bits can still
+# collide, so the repository retries an insert whose fresh id is taken.
+# Ids sort by creation time and stay above the old millisecond-timestamp ids.
+# They exceed 2**53, so JSON output carries them as strings.
+ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+
+
+class IdGenerator:
+    """Monotonic, time-sortable id source; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reseed()
+
+    def reseed(self):
+        self._node = os.getpid() & ((1 << NODE_BITS) - 1)
+        self._last_ms = -1
+        self._sequence = 0
+
+    def __call__(self):
+        with self._lock:
+            now = max(int(time.time() * 1000) - ID_EPOCH_MS, self._last_ms)
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & ((1 << SEQUENCE_BITS) - 1)
+                if self._sequence == 0:  # 4096 ids this ms: borrow the next one
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (NODE_BITS + SEQUENCE_BITS)) | (self._node << SEQUENCE_BITS) | self._sequence
+
+
+new_task_id = IdGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=new_task_id.reseed)
+
+
+def parse_due(value):
+    """Parse a datetime-local string ('2025-07-01T09:30'); None if empty or invalid."""
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class Task:
+    """One to-do item. Priority and category strings are interned, so
+    thousands of tasks share a handful of string objects."""
+    id: int = None
+    name: str = None
+    description: str = ""
+    due: datetime = None
+    priority: str = "Medium"
+    category: str = ""
+    checked: bool = False
+    subtasks: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.priority = sys.intern(self.priority or "Medium")
+        self.category = sys.intern(self.category or "")
+        self.description = self.description or ""
+        self.due = parse_due(self.due)
+
+    @property
+    def due_text(self):
+        """Due date in the form the datetime-local input uses, '' if unset."""
+        return self.due.isoformat(timespec='minutes') if self.due else ""
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a (id, name, description, due, priority, category, checked, subtasks) row."""
+        id, name, description, due, priority, category, checked, subtasks = row
+        return cls(id, name, description, due or None, priority, category, bool(checked),
+                   loads(subtasks) if subtasks != "[]" else [])
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            id=data.get("id"),
+            name=data.get("name"),
+            description=data.get("description"),
+            due=data.get("due") or None,
+            priority=data.get("priority"),
+            category=data.get("category"),
+            checked=bool(data.get("checked")),
+            subtasks=list(data.get("subtasks") or []),
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "due": self.due_text,
+            "priority": self.priority,
+            "category": self.category,
+            "checked": self.checked,
+            "subtasks": self.subtasks,
+        }
+
+
+def _default(obj):
+    if isinstance(obj, Task):
+        # JavaScript numbers are exact only up to 2**53
+        return dict(obj.to_dict(), id=str(obj.id))
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize to UTF-8 JSON bytes; Task objects are encoded via to_dict(), id as a string."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
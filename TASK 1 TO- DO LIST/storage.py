@@ -0,0 +1,783 @@
+# storage.py for TaskElevate Pro+
+# SQLite (WAL) repository for users and tasks, plus a one-shot JSON migrator.
+
+import json, os, re, sqlite3, sys, tempfile, threading, zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from models import Task, dumps, new_task_id, parse_due
+
+USERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+"""
+
+# High > Medium > Low; anything else sorts last. Queries must use this exact
+# expression for SQLite to walk idx_todos_priority instead of sorting.
+PRIORITY_RANK = "CASE priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 2 ELSE 3 END"
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+SORT_ORDERS = {
+    "priority": f"{PRIORITY_RANK}, todos.id",
+    "due": "todos.due, todos.id",
+}
+SORT_KEYS = {
+    "priority": lambda t: (PRIORITY_ORDER.get(t.priority, 3), t.id),
+    "due": lambda t: (t.due_text, t.id),
+}
+PAGE_SIZE = 50
+
+# LRU bounds of the in-process cache: accounts with cached data, and cached
+# views (full list, listing pages) per account
+CACHED_USERS = 1024
+CACHED_VIEWS = 32
+
+TODOS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    name TEXT,
+    description TEXT NOT NULL DEFAULT '',
+    due TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    category TEXT NOT NULL DEFAULT '',
+    checked INTEGER NOT NULL DEFAULT 0,
+    subtasks TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_todos_user ON todos (username, id);
+CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos (username, {PRIORITY_RANK}, id);
+CREATE INDEX IF NOT EXISTS idx_todos_due ON todos (username, due, id);
+"""
+
+# Trigram index over task names/descriptions, kept in sync by triggers.
+# Trigrams match substrings ("work" finds "homework"), like the plain scan
+# the search replaced. Results are scoped with todos.username, not through
+# the index, so any username works.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+    name, description,
+    content='todos', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN
+    INSERT INTO todos_fts (rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF name, description ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO todos_fts (rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+"""
+# Word-prefix index of earlier versions; replaced on open
+OLD_SEARCH_SCHEMA = """
+DROP TRIGGER IF EXISTS todos_fts_ai;
+DROP TRIGGER IF EXISTS todos_fts_ad;
+DROP TRIGGER IF EXISTS todos_fts_au;
+DROP TABLE IF EXISTS todos_fts;
+"""
+
+# Per-user counters kept current by triggers: one 'all' row plus one row per
+# priority and per category, each with total and done counts. Overdue is
+# time-dependent, so it is counted on idx_todos_open_due instead.
+COUNTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todo_counts (
+    username TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (username, dimension, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_todos_open_due ON todos (username, checked, due);
+CREATE TRIGGER IF NOT EXISTS todo_counts_ai AFTER INSERT ON todos BEGIN
+    INSERT INTO todo_counts (username, dimension, value, total, done)
+    VALUES (new.username, 'all', '', 1, new.checked),
+           (new.username, 'priority', new.priority, 1, new.checked),
+           (new.username, 'category', new.category, 1, new.checked)
+    ON CONFLICT (username, dimension, value)
+    DO UPDATE SET total = total + 1, done = done + excluded.done;
+END;
+CREATE TRIGGER IF NOT EXISTS todo_counts_ad AFTER DELETE ON todos BEGIN
+    UPDATE todo_counts SET total = total - 1, done = done - old.checked
+    WHERE username = old.username AND (
+        (dimension = 'all' AND value = '') OR
+        (dimension = 'priority' AND value = old.priority) OR
+        (dimension = 'category' AND value = old.category));
+    DELETE FROM todo_counts WHERE username = old.username AND total = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS todo_counts_au AFTER UPDATE OF username, checked, priority, category ON todos BEGIN
+    UPDATE todo_counts SET total = total - 1, done = done - old.checked
+    WHERE username = old.username AND (
+        (dimension = 'all' AND value = '') OR
+        (dimension = 'priority' AND value = old.priority) OR
+        (dimension = 'category' AND value = old.category));
+    INSERT INTO todo_counts (username, dimension, value, total, done)
+    VALUES (new.username, 'all', '', 1, new.checked),
+           (new.username, 'priority', new.priority, 1, new.checked),
+           (new.username, 'category', new.category, 1, new.checked)
+    ON CONFLICT (username, dimension, value)
+    DO UPDATE SET total = total + 1, done = done + excluded.done;
+    DELETE FROM todo_counts WHERE username = old.username AND total = 0;
+END;
+"""
+
+COUNTS_BACKFILL = """
+INSERT INTO todo_counts (username, dimension, value, total, done)
+SELECT username, 'all', '', COUNT(*), SUM(checked) FROM todos GROUP BY username
+UNION ALL
+SELECT username, 'priority', priority, COUNT(*), SUM(checked) FROM todos GROUP BY username, priority
+UNION ALL
+SELECT username, 'category', category, COUNT(*), SUM(checked) FROM todos GROUP BY username, category
+"""
+
+# bm25 column weights: name, description
+SEARCH_RANK = "bm25(todos_fts, 4.0, 1.0)"
+SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+TRIGRAM = 3  # shorter terms cannot use the index and are checked with LIKE
+
+# Writers append to the WAL; a background thread folds it back into the
+# database file. Connections still auto-checkpoint past this many pages as a
+# safety net if the checkpointer is not running.
+CHECKPOINT_INTERVAL = 5.0
+AUTOCHECKPOINT_PAGES = 10000
+
+ID_RETRIES = 3  # fresh ids drawn again when an insert finds its id taken
+
+TODO_COLUMNS = ("id", "name", "description", "due", "priority", "category", "checked", "subtasks")
+EDITABLE_FIELDS = ("name", "description", "due", "priority", "category")
+# JSON types accepted for task fields in API input; null is always accepted
+FIELD_TYPES = {"name": str, "description": str, "due": str, "priority": str,
+               "category": str, "checked": (bool, int), "subtasks": list}
+
+
+class TodoRepository:
+    """Users and per-user task lists stored in SQLite databases.
+
+    Users live in the main database file. Tasks are split into `shards`
+    bucket files picked by a stable hash of the username, so each account
+    only touches its own bucket and writers in different buckets never wait
+    on each other's lock. With one shard everything stays in the main file.
+    Changing the shard count means exporting and migrating again.
+
+    Every lookup goes through the (username, id) index, so toggling or
+    deleting a task is a point update instead of a rewrite of all tasks.
+
+    Parsed task lists and user records are cached in-process. Writes through
+    this repository drop the affected entry; commits from other processes
+    (other gunicorn workers) are noticed through `PRAGMA data_version` on one
+    watcher connection per database file and drop what was cached from it.
+    """
+
+    def __init__(self, path, shards=1):
+        self.path = path
+        self.shards = shards
+        if shards == 1:
+            self.shard_paths = [path]
+        else:
+            root, ext = os.path.splitext(path)
+            self.shard_paths = [f"{root}-todos-{i:02d}{ext}" for i in range(shards)]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._watchers = {}
+        self._versions = {}
+        self._version_lock = threading.Lock()
+        self._todo_cache = OrderedDict()
+        self._user_cache = OrderedDict()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._checkpointer = None
+        self._stop = threading.Event()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(USERS_SCHEMA)
+        self.full_text = True
+        for shard_path in self.shard_paths:
+            conn = self._conn(shard_path)
+            conn.executescript(TODOS_SCHEMA)
+            self._create_counters(conn)
+            self.full_text = self.full_text and self._create_search_index(conn)
+
+    @staticmethod
+    def _create_counters(conn):
+        """Create the counter table and triggers, back-filling it for existing rows.
+
+        All in one IMMEDIATE transaction: workers opening the database at
+        the same time cannot both back-fill, nor miss rows written between
+        the create and the back-fill.
+        """
+        # executescript() would commit first, so statements go one by one
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'todo_counts'").fetchone()
+            for statement in _statements(COUNTS_SCHEMA):
+                conn.execute(statement)
+            if not exists:
+                conn.execute(COUNTS_BACKFILL)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _create_search_index(conn):
+        """Create the trigram index (back-filling existing rows); False if SQLite lacks it."""
+        exists = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'todos_fts'").fetchone()
+        if exists and "trigram" not in exists[0]:
+            conn.executescript(OLD_SEARCH_SCHEMA)
+            exists = None
+        try:
+            conn.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if not exists:
+            conn.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
+        return True
+
+    def _conn(self, path=None):
+        """This thread's connection to `path` (the main database by default)."""
+        path = path or self.path
+        conns = self._local.__dict__.setdefault('conns', {})
+        conn = conns.get(path)
+        if conn is None:
+            # timeout doubles as busy_timeout: workers queue on the write lock
+            # instead of failing with "database is locked".
+            conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA wal_autocheckpoint={AUTOCHECKPOINT_PAGES}")
+            conns[path] = conn
+        return conn
+
+    def shard_path(self, username):
+        return self.shard_paths[zlib.crc32(username.encode('utf-8')) % self.shards]
+
+    def _todo_conn(self, username):
+        return self._conn(self.shard_path(username))
+
+    # ---------- Checkpointing ----------
+    def start_checkpointer(self, interval=CHECKPOINT_INTERVAL):
+        """Compact the WAL into the database file from a daemon thread."""
+        if self._checkpointer is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                for path in {self.path, *self.shard_paths}:
+                    try:
+                        self._conn(path).execute("PRAGMA wal_checkpoint(PASSIVE)")
+                    except sqlite3.Error:
+                        pass  # retried on the next tick
+
+        self._stop.clear()
+        self._checkpointer = threading.Thread(target=run, name="wal-checkpointer", daemon=True)
+        self._checkpointer.start()
+
+    def stop_checkpointer(self):
+        if self._checkpointer is not None:
+            self._stop.set()
+            self._checkpointer.join()
+            self._checkpointer = None
+
+    # ---------- Cache ----------
+    def _revalidate(self, path):
+        """Drop what was cached from `path` if anything committed to it since the last look.
+
+        data_version only changes for commits made through *other*
+        connections, so each file gets one process-wide watcher connection
+        that never writes: every commit, from any thread or process, moves
+        its counter, whichever thread happens to look next.
+        """
+        with self._version_lock:
+            watcher = self._watchers.get(path)
+            if watcher is None:
+                watcher = self._watchers[path] = sqlite3.connect(
+                    path, isolation_level=None, check_same_thread=False)
+            version = watcher.execute("PRAGMA data_version").fetchone()[0]
+            changed = self._versions.get(path, version) != version
+            self._versions[path] = version
+        if changed:
+            self._invalidate_path(path)
+
+    def _cached(self, cache, key, path, load, limit):
+        """Cached `load()` under `key` in the LRU dict `cache()` returns.
+
+        The dict is looked up only after revalidating, so an invalidation
+        triggered by this very call is not answered from a detached dict.
+        """
+        self._revalidate(path)
+        with self._lock:
+            store = cache()
+            if key in store:
+                self._stats["hits"] += 1
+                store.move_to_end(key)
+                return store[key]
+            self._stats["misses"] += 1
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                store = cache()
+                store[key] = value
+                if len(store) > limit:
+                    store.popitem(last=False)
+        return value
+
+    def invalidate(self, username=None):
+        """Drop cached data for one user, or everything when no user is given."""
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            if username is None:
+                self._todo_cache.clear()
+                self._user_cache.clear()
+            else:
+                self._todo_cache.pop(username, None)
+                self._user_cache.pop(username, None)
+
+    def _invalidate_path(self, path):
+        """Drop the entries loaded from one database file."""
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            if path == self.path:
+                self._user_cache.clear()
+            for username in [u for u in self._todo_cache if self.shard_path(u) == path]:
+                del self._todo_cache[username]
+
+    def _todo_views(self, username):
+        """Per-user LRU of cached task views (full list, listing pages); call under _lock."""
+        views = self._todo_cache.get(username)
+        if views is None:
+            views = self._todo_cache[username] = OrderedDict()
+            if len(self._todo_cache) > CACHED_USERS:
+                self._todo_cache.popitem(last=False)
+        else:
+            self._todo_cache.move_to_end(username)
+        return views
+
+    def cache_stats(self):
+        with self._lock:
+            views = sum(len(v) for v in self._todo_cache.values())
+            return dict(self._stats, users=len(self._user_cache), todo_views=views)
+
+    @contextmanager
+    def transaction(self, path=None):
+        conn = self._conn(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ---------- Users ----------
+    def get_user(self, username):
+        return self._cached(lambda: self._user_cache, username, self.path,
+                            lambda: self._load_user(username), CACHED_USERS)
+
+    def _load_user(self, username):
+        row = self._conn().execute(
+            "SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return {"password": row[0]} if row else None
+
+    def add_user(self, username, password):
+        """Create a user; returns False if the name is taken."""
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+            (username, password))
+        self.invalidate(username)
+        return cur.rowcount == 1
+
+    # ---------- Todos ----------
+    def list_todos(self, username):
+        """Return the user's Tasks; the list is a copy, the Task objects are shared."""
+        return list(self._cached(lambda: self._todo_views(username), "all", self.shard_path(username),
+                                 lambda: self._load_todos(username), CACHED_VIEWS))
+
+    def _load_todos(self, username):
+        rows = self._todo_conn(username).execute(
+            f"SELECT {', '.join(TODO_COLUMNS)} FROM todos WHERE username = ? ORDER BY id",
+            (username,))
+        return [Task.from_row(row) for row in rows]
+
+    def search_todos(self, username, text):
+        """Tasks whose name/description contain every word of `text`, best match first."""
+        terms = SEARCH_TERM.findall(text.lower())
+        if not terms:
+            return self.list_todos(username)
+        if not self.full_text:
+            return [t for t in self.list_todos(username)
+                    if all(term in f"{t.name or ''} {t.description}".lower() for term in terms)]
+        source, where, params = _search_clause(terms)
+        order = SEARCH_RANK if source != "todos" else "todos.id"
+        columns = ", ".join(f"todos.{c}" for c in TODO_COLUMNS)
+        rows = self._todo_conn(username).execute(
+            f"SELECT {columns} FROM {source} WHERE todos.username = ? AND {' AND '.join(where)} "
+            f"ORDER BY {order}", (username, *params))
+        return [Task.from_row(row) for row in rows]
+
+    def page_todos(self, username, search="", priority=None, category=None, sort=None,
+                   page=1, per_page=PAGE_SIZE):
+        """One page of the user's filtered list as (tasks, total, completed).
+
+        Sorting walks idx_todos_priority/idx_todos_due, so only the requested
+        page is read and parsed. Search results without a sort are ranked by
+        relevance. The most recent pages are cached per user until the next
+        write.
+        """
+        page = max(1, page)
+        key = ("page", search, priority, category, sort, page, per_page)
+        return self._cached(lambda: self._todo_views(username), key, self.shard_path(username),
+                            lambda: self._load_page(username, search, priority, category, sort, page, per_page),
+                            CACHED_VIEWS)
+
+    def _load_page(self, username, search, priority, category, sort, page, per_page):
+        offset = (page - 1) * per_page
+        terms = SEARCH_TERM.findall(search.lower())
+        if terms and not self.full_text:
+            items = [t for t in self.search_todos(username, search)
+                     if (not priority or t.priority == priority)
+                     and (not category or t.category == category)]
+            if sort in SORT_KEYS:
+                items.sort(key=SORT_KEYS[sort])
+            done = sum(1 for t in items if t.checked)
+            return items[offset:offset + per_page], len(items), done
+
+        source = "todos"
+        where, params = ["todos.username = ?"], [username]
+        order = SORT_ORDERS.get(sort, "todos.id")
+        if terms:
+            source, conditions, values = _search_clause(terms)
+            where.extend(conditions)
+            params.extend(values)
+            if sort not in SORT_ORDERS and source != "todos":
+                order = SEARCH_RANK
+        if priority:
+            where.append("todos.priority = ?")
+            params.append(priority)
+        if category:
+            where.append("todos.category = ?")
+            params.append(category)
+        clause = " AND ".join(where)
+        conn = self._todo_conn(username)
+        if terms or (priority and category):
+            total, done = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(todos.checked), 0) FROM {source} WHERE {clause}",
+                params).fetchone()
+        elif priority:
+            total, done = self._count(conn, username, "priority", priority)
+        elif category:
+            total, done = self._count(conn, username, "category", category)
+        else:
+            total, done = self._count(conn, username, "all", "")
+        columns = ", ".join(f"todos.{c}" for c in TODO_COLUMNS)
+        rows = conn.execute(
+            f"SELECT {columns} FROM {source} WHERE {clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            (*params, per_page, offset))
+        return [Task.from_row(row) for row in rows], total, done
+
+    @staticmethod
+    def _count(conn, username, dimension, value):
+        row = conn.execute(
+            "SELECT total, done FROM todo_counts WHERE username = ? AND dimension = ? AND value = ?",
+            (username, dimension, value)).fetchone()
+        return row or (0, 0)
+
+    def stats(self, username, now=None):
+        """Task counters for one user, read from todo_counts without loading any tasks."""
+        conn = self._todo_conn(username)
+        result = {"total": 0, "done": 0, "undone": 0, "overdue": 0, "by_priority": {}, "by_category": {}}
+        rows = conn.execute(
+            "SELECT dimension, value, total, done FROM todo_counts WHERE username = ?", (username,))
+        for dimension, value, total, done in rows:
+            if dimension == "all":
+                result.update(total=total, done=done, undone=total - done)
+            else:
+                result["by_" + dimension][value] = {"total": total, "done": done}
+        now = (now or datetime.now()).isoformat(timespec='minutes')
+        result["overdue"] = conn.execute(
+            "SELECT COUNT(*) FROM todos WHERE username = ? AND checked = 0 AND due != '' AND due < ?",
+            (username, now)).fetchone()[0]
+        return result
+
+    def add_todo(self, username, todo):
+        """Insert a Task, assigning a fresh id if it has none."""
+        todo.id = self._insert(self._todo_conn(username), username, todo)
+        self.invalidate(username)
+        return todo
+
+    def toggle_todo(self, username, todo_id):
+        found = self._toggle(self._todo_conn(username), username, todo_id)
+        self.invalidate(username)
+        return found
+
+    def delete_todo(self, username, todo_id):
+        found = self._delete(self._todo_conn(username), username, todo_id)
+        self.invalidate(username)
+        return found
+
+    def update_todo(self, username, todo_id, fields):
+        """Overwrite the editable fields present in `fields`."""
+        found = self._update(self._todo_conn(username), username, todo_id, fields)
+        self.invalidate(username)
+        return found
+
+    def apply_batch(self, username, ops):
+        """Apply many operations for one user in a single transaction.
+
+        Each op is {"op": "add", "task": Task or {...}}, {"op": "toggle", "id": n},
+        {"op": "delete", "id": n} or {"op": "edit", "id": n, "fields": {...}}.
+        Returns the final state of every added/changed task, the deleted ids
+        and the ids that did not exist. A malformed op raises ValueError and
+        nothing is applied.
+        """
+        changed, deleted, missing = {}, [], []
+        with self.transaction(self.shard_path(username)) as conn:
+            for index, op in enumerate(ops):
+                kind = op.get("op") if isinstance(op, dict) else None
+                if kind == "add":
+                    task = op.get("task")
+                    if not isinstance(task, Task):
+                        task = Task.from_dict(dict(_check_fields(index, "task", task or {}), id=None))
+                    changed[self._insert(conn, username, task)] = True
+                    continue
+                if kind not in ("toggle", "delete", "edit"):
+                    raise ValueError(f"op {index}: unknown operation {kind!r}")
+                try:
+                    todo_id = int(op["id"])
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"op {index}: missing or invalid id")
+                if kind == "edit":
+                    fields = _check_fields(index, "fields", op.get("fields") or {})
+                    if not set(fields) & set(EDITABLE_FIELDS):
+                        raise ValueError(f"op {index}: no editable fields")
+                if kind == "toggle":
+                    found = self._toggle(conn, username, todo_id)
+                elif kind == "delete":
+                    found = self._delete(conn, username, todo_id)
+                else:
+                    found = self._update(conn, username, todo_id, op.get("fields") or {})
+                if not found:
+                    missing.append(todo_id)
+                elif kind == "delete":
+                    changed.pop(todo_id, None)
+                    deleted.append(todo_id)
+                else:
+                    changed[todo_id] = True
+            records = [self._fetch(conn, username, todo_id) for todo_id in changed]
+        self.invalidate(username)
+        return {"changed": records, "deleted": deleted, "missing": missing}
+
+    # Single-statement helpers shared by the one-off methods and apply_batch.
+    def _insert(self, conn, username, todo):
+        fresh = todo.id is None
+        if fresh:
+            todo.id = new_task_id()
+        for attempt in range(ID_RETRIES + 1):
+            try:
+                cur = conn.execute(
+                    f"INSERT INTO todos (username, {', '.join(TODO_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._todo_params(username, todo))
+                return cur.lastrowid
+            except sqlite3.IntegrityError:
+                # Another worker whose node shares our pid bits drew the same id
+                if not fresh or attempt == ID_RETRIES:
+                    raise
+                todo.id = new_task_id()
+
+    @staticmethod
+    def _toggle(conn, username, todo_id):
+        cur = conn.execute(
+            "UPDATE todos SET checked = NOT checked WHERE id = ? AND username = ?",
+            (todo_id, username))
+        return cur.rowcount == 1
+
+    @staticmethod
+    def _delete(conn, username, todo_id):
+        cur = conn.execute(
+            "DELETE FROM todos WHERE id = ? AND username = ?", (todo_id, username))
+        return cur.rowcount == 1
+
+    @staticmethod
+    def _update(conn, username, todo_id, fields):
+        fields = {k: (v if v is not None or k == "name" else "")
+                  for k, v in fields.items() if k in EDITABLE_FIELDS}
+        if "due" in fields:
+            due = parse_due(fields["due"] or None)
+            fields["due"] = due.isoformat(timespec='minutes') if due else ""
+        if not fields:
+            return False
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        cur = conn.execute(
+            f"UPDATE todos SET {assignments} WHERE id = ? AND username = ?",
+            (*fields.values(), todo_id, username))
+        return cur.rowcount == 1
+
+    @staticmethod
+    def _fetch(conn, username, todo_id):
+        row = conn.execute(
+            f"SELECT {', '.join(TODO_COLUMNS)} FROM todos WHERE id = ? AND username = ?",
+            (todo_id, username)).fetchone()
+        return Task.from_row(row)
+
+    @staticmethod
+    def _todo_params(username, todo):
+        return (
+            username,
+            todo.id,
+            todo.name,
+            todo.description,
+            todo.due_text,
+            todo.priority,
+            todo.category,
+            int(todo.checked),
+            dumps(todo.subtasks).decode("utf-8"),
+        )
+
+    # ---------- Migration ----------
+    def migrate_from_json(self, user_file, todo_file):
+        """Import the legacy users.json/todos.json files.
+
+        Users are imported in one transaction and each shard's tasks in one
+        more. Existing users are kept; a task whose id is already taken is
+        given a fresh id rather than dropped. Returns (users, todos) imported.
+        """
+        users = _read_json(user_file)
+        todos = _read_json(todo_file)
+        n_users = n_todos = 0
+        with self.transaction() as conn:
+            for username, record in users.items():
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+                    (username, record["password"]))
+                n_users += cur.rowcount
+        by_shard = {}
+        for username, items in todos.items():
+            by_shard.setdefault(self.shard_path(username), []).append((username, items))
+        sql = f"INSERT INTO todos (username, {', '.join(TODO_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        for path, accounts in by_shard.items():
+            with self.transaction(path) as conn:
+                for username, items in accounts:
+                    for todo in items:
+                        params = self._todo_params(username, Task.from_dict(todo))
+                        try:
+                            conn.execute(sql, params)
+                        except sqlite3.IntegrityError:
+                            conn.execute(sql, (username, new_task_id(), *params[2:]))
+                        n_todos += 1
+        self.invalidate()
+        return n_users, n_todos
+
+    def export_json(self, user_file, todo_file):
+        """Write users.json/todos.json, reading each database from one snapshot."""
+        users = {u: {"password": p} for u, p in self._conn().execute("SELECT username, password FROM users")}
+        todos = {}
+        for path in self.shard_paths:
+            conn = self._conn(path)
+            conn.execute("BEGIN")
+            try:
+                rows = conn.execute(f"SELECT username, {', '.join(TODO_COLUMNS)} FROM todos ORDER BY username, id")
+                for row in rows:
+                    todos.setdefault(row[0], []).append(Task.from_row(row[1:]).to_dict())
+            finally:
+                conn.execute("COMMIT")
+        _write_json_atomic(user_file, users)
+        _write_json_atomic(todo_file, todos)
+        return len(users), sum(len(items) for items in todos.values())
+
+
+def _statements(script):
+    """Split a schema script into single statements (trigger bodies stay whole)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+
+
+def _check_fields(index, key, data):
+    """Return `data` if it is an object whose task fields have the accepted types."""
+    if not isinstance(data, dict):
+        raise ValueError(f"op {index}: '{key}' must be an object")
+    for name, kind in FIELD_TYPES.items():
+        if data.get(name) is not None and not isinstance(data[name], kind):
+            raise ValueError(f"op {index}: invalid value for '{name}'")
+    return data
+
+
+def _search_clause(terms):
+    """(source, conditions, params) matching rows that contain every term.
+
+    Terms of three or more characters go through the trigram index; shorter
+    ones are checked with LIKE on the rows it returns (or on the user's rows
+    when every term is short).
+    """
+    long_terms = [term for term in terms if len(term) >= TRIGRAM]
+    source, where, params = "todos", [], []
+    if long_terms:
+        source = "todos_fts CROSS JOIN todos ON todos.id = todos_fts.rowid"
+        where.append("todos_fts MATCH ?")
+        params.append(" AND ".join(f'"{term}"' for term in long_terms))
+    for term in terms:
+        if len(term) < TRIGRAM:
+            pattern = "%" + term.replace("\\", "\\\\").replace("_", "\\_") + "%"
+            where.append("(todos.name LIKE ? ESCAPE '\\' OR todos.description LIKE ? ESCAPE '\\')")
+            params.extend((pattern, pattern))
+    return source, where, params
+
+
+def _read_json(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def _write_json_atomic(path, data):
+    """Write to a temp file in the same directory, fsync, then rename over `path`.
+
+    Readers see either the old file or the new one, never a truncated one.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# ---------- CLI ----------
+if __name__ == "__main__":
+    # python storage.py migrate|export [users.json] [todos.json] [database] [shards]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "export"):
+        print("Usage: python storage.py migrate|export [users.json] [todos.json] [database] [shards]")
+        sys.exit(1)
+    args = sys.argv[2:]
+    user_file = args[0] if len(args) > 0 else os.path.join('data', 'users.json')
+    todo_file = args[1] if len(args) > 1 else os.path.join('data', 'todos.json')
+    db_file = args[2] if len(args) > 2 else os.path.join('data', 'taskelevate.db')
+    shards = int(args[3]) if len(args) > 3 else 8
+    repo = TodoRepository(db_file, shards=shards)
+    if sys.argv[1] == "migrate":
+        n_users, n_todos = repo.migrate_from_json(user_file, todo_file)
+        print(f"Migrated {n_users} users and {n_todos} tasks into {db_file}")
+    else:
+        n_users, n_todos = repo.export_json(user_file, todo_file)
+        print(f"Exported {n_users} users and {n_todos} tasks from {db_file}")
@@ -1,8 +1,13 @@
-from flask import Flask, render_template, request, jsonify
 import math
+from flask import Flask, Response, render_template, request, jsonify
+from evaluator import Evaluator, ExpressionError, check_result, np
+from sandbox import Sandbox
 
 app = Flask(__name__)
 
+# Powers and factorials run in time-limited worker processes (see sandbox.py)
+evaluator = Evaluator(sandbox=Sandbox())
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -12,19 +17,64 @@ def calculate():
     try:
         expr = request.json['expression']
 
-        # Safe evaluation context
-        allowed_names = {}
-        allowed_names.update(math.__dict__)
-        allowed_names.update({
-            'abs': abs,
-            'pow': pow,
-            'round': round
-        })
-
-        result = eval(expr, {"__builtins__": {}}, allowed_names)
+        # Whitelisted, compiled once and cached (see evaluator.py)
+        result = check_result(evaluator.evaluate(expr, request.json.get('variables')))
         return jsonify({'result': result})
+    except ExpressionError as e:
+        # Too large, too slow, busy, unknown name...: say which
+        return jsonify({'error': str(e)})
     except Exception:
         return jsonify({'error': 'Invalid Expression'})
 
+@app.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
+    try:
+        data = request.json
+        results = evaluator.evaluate_batch(data['expressions'], data.get('variables'))
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e) or 'Invalid Request'}), 400
+
+@app.route('/calculate/vector', methods=['POST'])
+def calculate_vector():
+    """Evaluate one expression over columns of values.
+
+    JSON: {"expression": "sin(x)*y + 3", "columns": {"x": [...], "y": [...]},
+    "variables": {...}} -> {"result": [...]} with null for nan/inf.
+
+    Binary (Content-Type: application/octet-stream, NumPy required):
+    ?expression=...&columns=x,y with the columns' little-endian float64
+    values back to back in the body -> float64 result in the same layout.
+    """
+    try:
+        if request.mimetype == 'application/octet-stream':
+            if np is None:
+                raise ExpressionError("Binary columns need NumPy installed")
+            names = [n for n in request.args.get('columns', '').split(',') if n]
+            if not names:
+                raise ExpressionError("Name the columns with ?columns=x,y")
+            data = np.frombuffer(request.get_data(), dtype='<f8')
+            if len(data) % len(names):
+                raise ExpressionError("Body length must be a multiple of 8 bytes per column")
+            columns = dict(zip(names, data.reshape(len(names), -1)))
+            result = evaluator.evaluate_columns(request.args.get('expression', ''), columns)
+            return Response(np.ascontiguousarray(result, dtype='<f8').tobytes(),
+                            mimetype='application/octet-stream')
+
+        data = request.json
+        result = evaluator.evaluate_columns(data['expression'], data['columns'], data.get('variables'))
+        if np is not None:
+            finite = np.isfinite(result)
+            values = result.tolist() if finite.all() else np.where(finite, result, None).tolist()
+        else:
+            values = [v if math.isfinite(v) else None for v in result]
+        return jsonify({'result': values})
+    except Exception as e:
+        return jsonify({'error': str(e) or 'Invalid Request'}), 400
+
+@app.route('/cache-stats')
+def cache_stats():
+    return jsonify(evaluator.cache_stats())
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,584 @@
+# evaluator.py for the Luxury Scientific Calculator
+# Expressions are parsed with ast, checked against a whitelist (numbers,
+# arithmetic, math functions and constants, free variables), compiled to
+# bytecode once and cached by their normalized text. Variable values are
+# bound at evaluation time, so one compiled expression serves every binding.
+# Integer powers and factorials are bounded statically; expressions that use
+# them can additionally be handed to a time-limited sandbox (sandbox.py).
+# Before compiling, constant subtrees are folded and repeated subtrees are
+# computed once; integer functions are memoized.
+
+import ast
+import math
+import time
+import types
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorised column evaluation
+    np = None
+
+CACHE_SIZE = 1024              # compiled expressions kept in the LRU
+MAX_EXPRESSION_LENGTH = 1000   # longer input is rejected before parsing
+MAX_BATCH_SIZE = 10000         # expressions per evaluate_batch call
+BATCH_TIME_LIMIT = 2.0         # seconds of sandbox time one batch may use
+MAX_POINTS = 10_000_000        # rows per evaluate_columns call
+MAX_INT_BITS = 10_000          # largest integer a literal or power may produce
+MAX_FACTORIAL = 1000           # largest n for factorial, comb and perm
+MEMO_SIZE = 4096               # results kept per memoized function
+RESULT_CACHE_SIZE = 4096       # sandboxed results kept per Evaluator
+
+# Names that can do unbounded big-integer work; expressions using them (or
+# **) go to the sandbox when the Evaluator has one.
+INTEGER_FUNCTIONS = frozenset({'pow', 'factorial', 'comb', 'perm', 'isqrt', 'gcd', 'lcm', 'round'})
+
+
+class ExpressionError(ValueError):
+    """The expression is malformed or uses something outside the whitelist."""
+
+
+def _pow(base, exp, mod=None):
+    """pow()/** that refuses integer results above MAX_INT_BITS before computing them."""
+    if mod is None and type(base) is int and type(exp) is int and exp > 0 and abs(base) > 1:
+        if exp * math.log2(abs(base)) > MAX_INT_BITS:
+            raise ExpressionError(f"Result too large (limit is {MAX_INT_BITS} bits)")
+    return pow(base, exp) if mod is None else pow(base, exp, mod)
+
+
+def _mul(a, b):
+    """* that refuses integer products above MAX_INT_BITS before computing them."""
+    if type(a) is int and type(b) is int and a.bit_length() + b.bit_length() > MAX_INT_BITS:
+        raise ExpressionError(f"Result too large (limit is {MAX_INT_BITS} bits)")
+    return a * b
+
+
+def _round(number, ndigits=None):
+    """round() that refuses the huge 10**-ndigits an integer round(n, -k) computes."""
+    if type(number) is int and type(ndigits) is int and ndigits < -MAX_INT_BITS * math.log10(2):
+        raise ExpressionError(f"round() digits are limited to >= {-int(MAX_INT_BITS * math.log10(2))}")
+    return round(number, ndigits)
+
+
+def _check_n(name, n):
+    if type(n) is int and n > MAX_FACTORIAL:
+        raise ExpressionError(f"{name}() is limited to n <= {MAX_FACTORIAL}")
+
+
+def _factorial(n):
+    _check_n('factorial', n)
+    return math.factorial(n)
+
+
+def _comb(n, k):
+    _check_n('comb', n)
+    return math.comb(n, k)
+
+
+def _perm(n, k=None):
+    _check_n('perm', n)
+    return math.perm(n, k)
+
+
+# Built once at import: every public name in math plus a few builtins, with
+# the integer-growing ones replaced by bounded versions. The integer
+# functions are memoized: a repeat factorial(500) is a ~100 ns lookup
+# instead of ~10 us. Float functions are not, as sin() and friends are
+# cheaper than a cache lookup.
+MEMOIZED = {name: lru_cache(maxsize=MEMO_SIZE, typed=True)(function) for name, function in (
+    ('factorial', _factorial), ('comb', _comb), ('perm', _perm),
+    ('isqrt', math.isqrt), ('gcd', math.gcd), ('lcm', math.lcm))}
+FUNCTIONS = {name: value for name, value in vars(math).items() if not name.startswith('_')}
+FUNCTIONS.update(MEMOIZED)
+FUNCTIONS.update({'abs': abs, 'pow': _pow, 'round': _round})
+CONSTANTS = {name: value for name, value in FUNCTIONS.items() if type(value) is float}
+
+# `math` is present so the buttons' math.sin( ... ) style works; the
+# validator only lets it appear as math.<public name>. `_pow` and `_mul` are
+# what ** and * compile to and cannot be written by users (underscore names
+# are refused).
+MATH = types.SimpleNamespace(**{**{name: value for name, value in vars(math).items()
+                                   if not name.startswith('_')}, **MEMOIZED})
+NAMESPACE = {'__builtins__': {}, 'math': MATH, '_pow': _pow, '_mul': _mul, **FUNCTIONS}
+
+# NumPy equivalents of the math names, used when evaluating whole columns.
+# The same bytecode runs against this namespace, so operators become ufuncs.
+UFUNCS = {
+    'acos': 'arccos', 'acosh': 'arccosh', 'asin': 'arcsin', 'asinh': 'arcsinh',
+    'atan': 'arctan', 'atan2': 'arctan2', 'atanh': 'arctanh', 'cbrt': 'cbrt',
+    'ceil': 'ceil', 'copysign': 'copysign', 'cos': 'cos', 'cosh': 'cosh',
+    'degrees': 'degrees', 'exp': 'exp', 'exp2': 'exp2', 'expm1': 'expm1',
+    'fabs': 'fabs', 'floor': 'floor', 'fmod': 'fmod', 'hypot': 'hypot',
+    'isfinite': 'isfinite', 'isinf': 'isinf', 'isnan': 'isnan', 'log10': 'log10',
+    'log1p': 'log1p', 'log2': 'log2', 'radians': 'radians', 'sin': 'sin',
+    'sinh': 'sinh', 'sqrt': 'sqrt', 'tan': 'tan', 'tanh': 'tanh', 'trunc': 'trunc',
+    'abs': 'absolute',
+}
+
+
+def _numpy_namespace():
+    def log(x, base=None):
+        # numpy's log takes no base (its second argument is `out`)
+        return np.log(x) if base is None else np.log(x) / np.log(base)
+
+    def round_(x, ndigits=0):
+        return np.round(x, ndigits)
+
+    def power(x, y):
+        # On integer literals np.power works in int64, which wraps (2**100
+        # gives 0) and refuses negative exponents; go through float64 as
+        # the scalar path's results do
+        return np.power(np.asarray(x, dtype=np.float64), y)
+
+    def elementwise(function, integral=False):
+        def call(*args):
+            if integral:
+                # Columns are float64; factorial(3.0) should mean factorial(3)
+                args = [int(a) if float(a).is_integer() else a for a in args]
+            try:
+                return float(function(*args))
+            except (ArithmeticError, ValueError, TypeError):
+                return math.nan  # one bad row (gamma(0), factorial(2.5)) must not fail the rest
+        return np.vectorize(call, otypes=[float])
+
+    functions = {}
+    for name, value in FUNCTIONS.items():
+        if name in UFUNCS:
+            functions[name] = getattr(np, UFUNCS[name])
+        elif callable(value):
+            # No ufunc (gamma, erf, ...): element-wise, correct but slow
+            functions[name] = elementwise(value, integral=name in INTEGER_FUNCTIONS)
+        else:
+            functions[name] = value
+    functions.update({'log': log, 'round': round_, 'pow': power})
+    return {'__builtins__': {}, 'math': types.SimpleNamespace(**functions),
+            '_pow': power, '_mul': _mul, **functions}
+
+
+NUMPY_NAMESPACE = _numpy_namespace() if np is not None else None
+
+# Math names without a NumPy equivalent: over columns they run once per row
+# in Python (about 1 s per million rows), so they need the sandbox's budget
+ELEMENTWISE = frozenset(name for name, value in FUNCTIONS.items()
+                        if callable(value) and name not in UFUNCS
+                        and name not in ('log', 'round', 'pow'))
+
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+             ast.UAdd, ast.USub)
+
+# A compiled expression, whether it needs the sandbox, whether it stores
+# shared-subexpression temporaries (which need a private locals dict) and
+# whether over columns it calls functions row by row
+Compiled = namedtuple('Compiled', 'code sandboxed temporaries elementwise')
+
+
+class _Validator(ast.NodeVisitor):
+    """Reject every node that is not plain arithmetic on numbers and math names."""
+
+    def generic_visit(self, node):
+        raise ExpressionError(f"{type(node).__name__} is not allowed")
+
+    def visit_Expression(self, node):
+        self.visit(node.body)
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float, complex):
+            raise ExpressionError(f"{node.value!r} is not a number")
+        if type(node.value) is int and node.value.bit_length() > MAX_INT_BITS:
+            raise ExpressionError(f"Numbers are limited to {MAX_INT_BITS} bits")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, OPERATORS):
+            raise ExpressionError(f"{type(node.op).__name__} is not allowed")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, OPERATORS):
+            raise ExpressionError(f"{type(node.op).__name__} is not allowed")
+        self.visit(node.operand)
+
+    def visit_Name(self, node):
+        # Anything that is not a math name is a variable, resolved at eval time
+        if node.id == 'math' or node.id.startswith('_'):
+            raise ExpressionError(f"'{node.id}' is not allowed here")
+
+    def visit_Attribute(self, node):
+        if not (isinstance(node.value, ast.Name) and node.value.id == 'math'
+                and node.attr in vars(math) and not node.attr.startswith('_')):
+            raise ExpressionError("Only math.<function> attributes are allowed")
+
+    def visit_Call(self, node):
+        if node.keywords or not isinstance(node.func, (ast.Name, ast.Attribute)):
+            raise ExpressionError("Only plain calls like sqrt(2) are allowed")
+        self.visit(node.func)
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                raise ExpressionError("Star arguments are not allowed")
+            self.visit(arg)
+
+
+def normalize(expression):
+    """Canonical cache key: surrounding whitespace dropped, inner runs collapsed."""
+    return ' '.join(expression.split())
+
+
+def parse(expression):
+    """Parse and validate `expression`, returning its ast.Expression tree."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expressions are limited to {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f"Syntax error: {e.msg}") from None
+    _Validator().visit(tree)
+    return tree
+
+
+class _GuardIntegers(ast.NodeTransformer):
+    """Rewrite a ** b and a * b as _pow(a, b) and _mul(a, b), so integer
+    results are size-checked. Integer variables reach * without the
+    sandbox, so a chain x*x*...*x must not grow past MAX_INT_BITS."""
+
+    GUARDS = {ast.Pow: '_pow', ast.Mult: '_mul'}
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        guard = self.GUARDS.get(type(node.op))
+        if guard:
+            return ast.Call(ast.Name(guard, ast.Load()), [node.left, node.right], [])
+        return node
+
+
+def _uses(tree, names):
+    for node in ast.walk(tree):
+        name = getattr(node, 'attr', None) or getattr(node, 'id', None)
+        if isinstance(node, (ast.Name, ast.Attribute)) and name in names:
+            return True
+    return False
+
+
+def _needs_sandbox(tree):
+    return (any(isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) for node in ast.walk(tree))
+            or _uses(tree, INTEGER_FUNCTIONS))
+
+
+# Folding runs on the request thread with no time limit, so only provably
+# cheap subtrees are folded: float (or complex, or small int) operands, **
+# only with a non-integer operand, and calls of functions that are not
+# integer functions. Everything else is left for the (sandboxed) run.
+FOLD_INT_BITS = 53
+FOLDABLE = frozenset(name for name, value in FUNCTIONS.items()
+                     if callable(value) and name not in INTEGER_FUNCTIONS)
+
+
+def _cheap(node):
+    return isinstance(node, ast.Constant) and (
+        type(node.value) in (float, complex)
+        or type(node.value) is int and node.value.bit_length() <= FOLD_INT_BITS)
+
+
+class _FoldConstants(ast.NodeTransformer):
+    """Replace cheap constant subtrees (pi / 180, sqrt(2), 2 * 3.5) by their value.
+
+    Subtrees that fail (1/0) are left alone so the error surfaces when the
+    expression runs.
+    """
+
+    def visit_Name(self, node):
+        if node.id in CONSTANTS:
+            return ast.Constant(CONSTANTS[node.id])
+        return node
+
+    def visit_Attribute(self, node):
+        if node.attr in CONSTANTS:
+            return ast.Constant(CONSTANTS[node.attr])
+        return node
+
+    def _fold(self, node):
+        self.generic_visit(node)
+        if isinstance(node, ast.Call):
+            operands = node.args
+            if (getattr(node.func, 'attr', None) or getattr(node.func, 'id', None)) not in FOLDABLE:
+                return node
+        elif isinstance(node, ast.BinOp):
+            operands = [node.left, node.right]
+            if isinstance(node.op, ast.Pow) and all(type(o.value) is int for o in operands
+                                                    if isinstance(o, ast.Constant)):
+                return node  # 2**50 is cheap, but 2**(2**50) is not
+        else:
+            operands = [node.operand]
+        if not all(_cheap(o) for o in operands):
+            return node
+        try:
+            value = eval(compile(ast.fix_missing_locations(ast.Expression(node)),
+                                 '<fold>', 'eval'), NAMESPACE)
+        except Exception:
+            return node
+        if type(value) not in (int, float, complex):
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    visit_BinOp = visit_UnaryOp = visit_Call = _fold
+
+
+def _structure_keys(tree):
+    """Map id(node) -> int, equal for structurally equal subtrees.
+
+    Keys are built bottom-up from the children's keys, so this is linear
+    in the tree size (ast.dump per node is quadratic on x*x*...*x).
+    """
+    keys, interned = {}, {}
+
+    def key(node):
+        if isinstance(node, ast.Constant):
+            shape = ('Constant', type(node.value).__name__, repr(node.value))
+        elif isinstance(node, ast.Name):
+            shape = ('Name', node.id)
+        else:
+            shape = (type(node).__name__, type(getattr(node, 'op', None)).__name__,
+                     getattr(node, 'attr', None), *map(key, ast.iter_child_nodes(node)))
+        keys[id(node)] = interned.setdefault(shape, len(interned))
+        return keys[id(node)]
+
+    key(tree.body)
+    return keys
+
+
+class _ShareSubexpressions(ast.NodeTransformer):
+    """Compute repeated subtrees once: sin(x)*y + sin(x) becomes
+    (_c0 := sin(x))*y + _c0. Evaluation is strictly left to right here (no
+    conditionals), so the first occurrence always runs before the reuses.
+    """
+
+    def __init__(self, tree):
+        self.keys = _structure_keys(tree)
+        counts = Counter(self.keys[id(node)] for node in ast.walk(tree)
+                         if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Call)))
+        self.repeated = {key for key, count in counts.items() if count > 1}
+        self.names = {}
+
+    def _share(self, node):
+        key = self.keys[id(node)]
+        if key not in self.repeated:
+            return self.generic_visit(node)
+        if key in self.names:
+            return ast.Name(self.names[key], ast.Load())
+        name = self.names[key] = f'_c{len(self.names)}'
+        return ast.NamedExpr(ast.Name(name, ast.Store()), self.generic_visit(node))
+
+    visit_BinOp = visit_UnaryOp = visit_Call = _share
+
+
+def optimize(tree):
+    """Fold constants, then share repeated subexpressions; return (tree, shared?)."""
+    tree = _FoldConstants().visit(tree)
+    sharer = _ShareSubexpressions(tree)
+    tree = sharer.visit(tree)
+    return ast.fix_missing_locations(tree), bool(sharer.names)
+
+
+def compile_expression(expression):
+    """Validated, optimized and guarded bytecode for one (normalized) expression."""
+    try:
+        tree, temporaries = optimize(parse(expression))
+        sandboxed = _needs_sandbox(tree)
+        elementwise = _uses(tree, ELEMENTWISE)
+        tree = ast.fix_missing_locations(_GuardIntegers().visit(tree))
+        return Compiled(compile(tree, '<expression>', 'eval'), sandboxed, temporaries, elementwise)
+    except RecursionError:
+        # x+x+...+x nests one level per operator; the tree walks recurse
+        raise ExpressionError("Expression is too deeply nested") from None
+
+
+def check_name(name):
+    """Raise unless `name` can be used as a variable."""
+    if not (isinstance(name, str) and name.isidentifier()) or name.startswith('_'):
+        raise ExpressionError(f"'{name}' is not a valid variable name")
+    if name in NAMESPACE:
+        raise ExpressionError(f"'{name}' is a built-in name and cannot be a variable")
+
+
+def check_variables(variables):
+    """Validate variable bindings: plain names mapped to real numbers."""
+    if not isinstance(variables, dict):
+        raise ExpressionError("Variables must be an object of name: number pairs")
+    for name, value in variables.items():
+        check_name(name)
+        if type(value) not in (int, float):
+            raise ExpressionError(f"Variable '{name}' must be a number")
+        if type(value) is int and value.bit_length() > MAX_INT_BITS:
+            raise ExpressionError(f"Variable '{name}' is limited to {MAX_INT_BITS} bits")
+    return variables
+
+
+def check_result(value):
+    """Return `value` if it can be sent as a JSON number, else raise ExpressionError."""
+    if isinstance(value, complex):
+        raise ExpressionError("Result is not a real number")
+    if isinstance(value, float) and not math.isfinite(value):
+        # JSON has no nan/inf; as a raw value it would break the response
+        raise ExpressionError("Result is not a finite number")
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        try:
+            str(value)  # subject to sys.get_int_max_str_digits()
+        except ValueError:
+            raise ExpressionError("Result has too many digits to display") from None
+    return value
+
+
+def check_columns(columns):
+    """Validate column bindings (name -> list or 1-D array); return (columns, rows)."""
+    if not isinstance(columns, dict) or not columns:
+        raise ExpressionError("Columns must be an object of name: [numbers] pairs")
+    rows = None
+    for name, values in columns.items():
+        check_name(name)
+        if np is not None and isinstance(values, np.ndarray):
+            if values.ndim != 1:
+                raise ExpressionError(f"Column '{name}' must be one-dimensional")
+        elif not isinstance(values, list) or not all(type(v) in (int, float) for v in values):
+            raise ExpressionError(f"Column '{name}' must be a list of numbers")
+        if rows is None:
+            rows = len(values)
+        elif len(values) != rows:
+            raise ExpressionError("All columns must have the same length")
+    if rows > MAX_POINTS:
+        raise ExpressionError(f"At most {MAX_POINTS} rows per request")
+    return columns, rows
+
+
+class Evaluator:
+    """Evaluates expressions, compiling each distinct one only once.
+
+    With a `sandbox` (see sandbox.Sandbox), expressions that can do
+    big-integer work run there under a time limit; plain float arithmetic
+    stays in-process. Sandboxed results are cached per (expression,
+    bindings), so a repeated request skips the worker round trip.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE, sandbox=None, result_cache_size=RESULT_CACHE_SIZE):
+        self._compiled = lru_cache(maxsize=cache_size)(compile_expression)
+        self._sandboxed = lru_cache(maxsize=result_cache_size)(self._run_sandboxed)
+        self.sandbox = sandbox
+
+    def compile(self, expression):
+        if not isinstance(expression, str):
+            raise ExpressionError("Expression must be a string")
+        return self._compiled(normalize(expression))
+
+    def _run_sandboxed(self, expression, bindings):
+        return self.sandbox.run(expression, {name: value for name, _, value in bindings})
+
+    def _run(self, compiled, expression, variables):
+        if compiled.sandboxed and self.sandbox is not None:
+            # The type is part of the key: x=1 and x=1.0 hash alike but
+            # can give different results (factorial, integer powers)
+            bindings = tuple(sorted((name, type(value).__name__, value)
+                                    for name, value in variables.items()))
+            return self._sandboxed(normalize(expression), bindings)
+        # Shared-subexpression temporaries are stored in locals, so they
+        # get a private copy of the (possibly shared) bindings
+        return eval(compiled.code, NAMESPACE, dict(variables) if compiled.temporaries else variables)
+
+    def evaluate(self, expression, variables=None):
+        compiled = self.compile(expression)
+        variables = check_variables(variables) if variables else {}
+        try:
+            return self._run(compiled, expression, variables)
+        except NameError as e:
+            raise ExpressionError(f"Unknown name '{e.name}'") from None
+
+    def evaluate_batch(self, expressions, variables=None):
+        """Evaluate many expressions with shared bindings; one result or error each.
+
+        Returns a list of {'result': value} / {'error': message} dicts in
+        input order, so one bad expression never fails the whole batch.
+        Results are always JSON numbers: nan, inf and integers too long
+        to print become errors.
+        Sandboxed items share BATCH_TIME_LIMIT: once a full sandbox timeout
+        no longer fits, the remaining ones are answered with an error.
+        """
+        if not isinstance(expressions, list):
+            raise ExpressionError("Expressions must be a list")
+        if len(expressions) > MAX_BATCH_SIZE:
+            raise ExpressionError(f"At most {MAX_BATCH_SIZE} expressions per batch")
+        variables = check_variables(variables) if variables else {}
+        deadline = time.monotonic() + BATCH_TIME_LIMIT
+        results = []
+        for expression in expressions:
+            try:
+                compiled = self.compile(expression)
+                if (compiled.sandboxed and self.sandbox is not None
+                        and time.monotonic() + self.sandbox.timeout > deadline):
+                    raise ExpressionError("Batch time limit reached")
+                value = self._run(compiled, expression, variables)
+                results.append({'result': check_result(value)})
+            except NameError as e:
+                results.append({'error': f"Unknown name '{e.name}'"})
+            except Exception as e:
+                results.append({'error': str(e) or type(e).__name__})
+        return results
+
+    def evaluate_columns(self, expression, columns, variables=None):
+        """Evaluate `expression` once per row of `columns`; return the results.
+
+        Columns map names to equal-length lists (or 1-D arrays) of numbers,
+        and scalar `variables` apply to every row. With NumPy the compiled
+        expression runs once over float64 arrays (math names map to ufuncs)
+        and an array comes back; without it each row is evaluated in a loop
+        and a list comes back. Rows that fail (log(-1), 1/0) give nan or inf
+        rather than an error, as in NumPy.
+
+        Work done row by row in Python (no NumPy, or functions without a
+        ufunc such as gamma) can take seconds over MAX_POINTS rows, so it
+        runs in the sandbox (if any), all rows under one time limit. Pure
+        ufunc expressions stay here: they take milliseconds, and on float64
+        arrays ** and * cannot grow integers.
+        """
+        compiled = self.compile(expression)
+        code = compiled.code
+        columns, rows = check_columns(columns)
+        if self.sandbox is not None and (np is None or compiled.elementwise):
+            return self.sandbox.run_columns(expression, columns, variables)
+        variables = dict(check_variables(variables)) if variables else {}
+        if np is not None:
+            variables.update((name, np.asarray(values, dtype=np.float64))
+                             for name, values in columns.items())
+            try:
+                with np.errstate(all='ignore'):
+                    result = eval(code, NUMPY_NAMESPACE, variables)
+            except NameError as e:
+                raise ExpressionError(f"Unknown name '{e.name}'") from None
+            if np.iscomplexobj(result):
+                raise ExpressionError("Result is not a real number")
+            return np.broadcast_to(np.asarray(result, dtype=np.float64), (rows,))
+
+        names = list(columns)
+        results = []
+        for row in zip(*columns.values()):
+            variables.update(zip(names, row))
+            try:
+                value = eval(code, NAMESPACE, variables)
+                value = math.nan if isinstance(value, complex) else float(value)
+            except NameError as e:
+                raise ExpressionError(f"Unknown name '{e.name}'") from None
+            except (ArithmeticError, ValueError, TypeError):
+                value = math.nan
+            results.append(value)
+        return results
+
+    def cache_info(self):
+        return self._compiled.cache_info()
+
+    def cache_stats(self):
+        """Hits, misses and sizes of the compile, result and function caches."""
+        stats = {'compiled': self._compiled.cache_info()._asdict(),
+                 'results': self._sandboxed.cache_info()._asdict()}
+        stats['functions'] = {name: function.cache_info()._asdict()
+                              for name, function in MEMOIZED.items()}
+        return stats
+
+
+evaluator = Evaluator()
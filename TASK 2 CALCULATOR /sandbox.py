@@ -0,0 +1,104 @@
+# sandbox.py for the Luxury Scientific Calculator
+# A small pool of supervised worker processes that evaluate expressions
+# under a wall-clock budget. A worker that overruns is killed and replaced,
+# so one pathological request costs at most `timeout` seconds and never
+# blocks the web server's threads.
+
+import multiprocessing
+import queue
+import threading
+
+from evaluator import Evaluator, ExpressionError
+
+WORKERS = 2               # sandbox processes
+EXPRESSION_TIMEOUT = 0.5  # seconds one expression may run
+COLUMNS_TIMEOUT = 5.0     # seconds one evaluation over columns may run
+
+
+def _serve(conn):
+    """Worker process loop: run (Evaluator method, args) calls until closed."""
+    evaluator = Evaluator()
+    while True:
+        try:
+            method, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, getattr(evaluator, method)(*args)))
+        except Exception as e:
+            conn.send((False, str(e) or type(e).__name__))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, method, args, timeout):
+        self.conn.send((method, args))
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class Sandbox:
+    """Evaluates expressions in worker processes with a per-expression time limit."""
+
+    def __init__(self, workers=WORKERS, timeout=EXPRESSION_TIMEOUT, columns_timeout=COLUMNS_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.columns_timeout = columns_timeout
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Lazily, so importing the app (or Flask's reloader) starts nothing
+        with self._lock:
+            if not self._started:
+                for _ in range(self.workers):
+                    self._idle.put(_Worker(self._context))
+                self._started = True
+
+    def run(self, expression, variables=None):
+        """Evaluate in a worker; ExpressionError on errors, overruns or overload."""
+        return self._call('evaluate', (expression, variables or {}), self.timeout)
+
+    def run_columns(self, expression, columns, variables=None):
+        """Evaluator.evaluate_columns in a worker, all rows under `columns_timeout`."""
+        return self._call('evaluate_columns', (expression, columns, variables), self.columns_timeout)
+
+    def _call(self, method, args, timeout):
+        if not self._started:
+            self._start()
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ExpressionError("The calculator is busy, please try again") from None
+        try:
+            ok, value = worker.call(method, args, timeout)
+        except TimeoutError:
+            worker.kill()
+            worker = _Worker(self._context)
+            raise ExpressionError(f"Expression took longer than {timeout}s") from None
+        except (EOFError, OSError):
+            worker.kill()
+            worker = _Worker(self._context)
+            raise ExpressionError("Expression could not be evaluated") from None
+        finally:
+            self._idle.put(worker)
+        if not ok:
+            raise ExpressionError(value)
+        return value
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get().kill()
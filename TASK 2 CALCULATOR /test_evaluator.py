@@ -0,0 +1,50 @@
+# test_evaluator.py for the Luxury Scientific Calculator
+# The NumPy and pure-Python column paths must agree with each other and
+# with evaluating one row at a time.
+
+import math
+
+import pytest
+
+import evaluator
+from evaluator import Evaluator
+
+COLUMNS = {'x': [0.0, 1.0, 2.5, -3.0]}
+INTEGER_COLUMNS = {'x': [0, 1, 5, 12]}
+
+
+def columns_without_numpy(monkeypatch, expression, columns=COLUMNS):
+    monkeypatch.setattr(evaluator, 'np', None)
+    return Evaluator().evaluate_columns(expression, columns)
+
+
+@pytest.mark.skipif(evaluator.np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize('expression', [
+    '2**100 + x', '10**19 * x', '2**-1 + x', 'pow(2, 100) + x',
+    'x**2', '2**x', '(-2)**3 * x', 'math.pow(x, 3)', 'gamma(x)', 'sqrt(x)',
+])
+def test_numpy_matches_pure_python(monkeypatch, expression):
+    vectorized = list(Evaluator().evaluate_columns(expression, COLUMNS))
+    rows = columns_without_numpy(monkeypatch, expression)
+    assert vectorized == pytest.approx(rows, nan_ok=True)
+
+
+@pytest.mark.skipif(evaluator.np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize('expression', ['factorial(x)', 'comb(x, 2) + x', 'gcd(x, 4)', 'isqrt(x)'])
+def test_integer_functions_match_pure_python(monkeypatch, expression):
+    vectorized = list(Evaluator().evaluate_columns(expression, INTEGER_COLUMNS))
+    rows = columns_without_numpy(monkeypatch, expression, INTEGER_COLUMNS)
+    assert vectorized == pytest.approx(rows, nan_ok=True)
+    assert not any(math.isnan(value) for value in rows)
+
+
+@pytest.mark.parametrize('expression', ['2**100 + x', '10**19 * x', '2**-1 + x'])
+def test_columns_match_single_evaluation(expression):
+    expected = [float(Evaluator().evaluate(expression, {'x': x})) for x in COLUMNS['x']]
+    assert list(Evaluator().evaluate_columns(expression, COLUMNS)) == pytest.approx(expected)
+
+
+def test_failing_rows_give_nan():
+    result = list(Evaluator().evaluate_columns('gamma(x)', {'x': [0.0, 1.0, 5.0]}))
+    assert math.isnan(result[0])
+    assert result[1:] == [1.0, 24.0]
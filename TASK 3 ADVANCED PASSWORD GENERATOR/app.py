@@ -9,18 +9,553 @@ import random
 import string
 import secrets
 import json
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import math
+import mmap
+import re
+import struct
 import urllib.parse
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque, namedtuple
+import multiprocessing
+import argparse
+import bisect
+import errno
+import signal
 import webbrowser
 import threading
 import time
 import os
 import sys
+from functools import lru_cache
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorised bulk assembly
+    np = None
+
+try:
+    import brotli
+except ImportError:  # optional: br encoding for the web page
+    brotli = None
+
+# Bulk generation
+RANDOM_BLOCK_SIZE = 1 << 16   # bytes pulled from os.urandom per refill
+BULK_CHUNK_SIZE = 10000       # passwords assembled per batch
+API_BULK_LIMIT = 10000        # largest count accepted by /api/bulk
+STREAM_BULK_LIMIT = 100_000_000  # largest count accepted by /api/bulk/stream
+PARALLEL_MIN_COUNT = 5000     # web bulk requests below this stay in-process
+PARALLEL_MIN_CHUNK = 1000     # smallest batch worth shipping to another process
+EXPORT_FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Web server defaults
+DEFAULT_THREADS = 8           # worker threads per process
+DEFAULT_QUEUE_SIZE = 64       # connections allowed to wait for a free thread
+KEEP_ALIVE_TIMEOUT = 5        # seconds an idle keep-alive connection is held
+MAX_BODY_SIZE = 64 * 1024     # largest JSON request body in bytes
+MAX_BATCH_BODY_SIZE = 2 * 1024 * 1024  # ... for /api/strength and /api/check batches
+PROFILE_CACHE_SIZE = 64       # option profiles kept per PasswordGenerator
+
+_system_random = secrets.SystemRandom()
+
+@lru_cache(maxsize=256)
+def _sampling_table(pool):
+    """Translation table turning random bytes into uniform picks from `pool`.
+    
+    Bytes at or above the largest multiple of len(pool) are deleted rather
+    than wrapped, so every character keeps exactly the same probability.
+    """
+    size = len(pool)
+    limit = 256 - 256 % size
+    table = bytes(pool[b % size] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+class SecureByteStream:
+    """Unbiased samples drawn from os.urandom in large blocks."""
+    
+    def __init__(self, block_size=RANDOM_BLOCK_SIZE):
+        self.block_size = block_size
+    
+    def sample(self, pool, count):
+        """Return `count` bytes drawn uniformly (with replacement) from `pool`.
+        
+        `pool` is a bytes object of 1-256 symbols; pass bytes(range(n)) to
+        get integers in [0, n).
+        """
+        table, delete = _sampling_table(pool)
+        # Expected acceptance rate is limit/256 (always above 1/2)
+        accept = (256 - len(delete)) / 256
+        parts = []
+        needed = count
+        while needed > 0:
+            request = min(max(int(needed / accept) + 64, 256), max(self.block_size, 256))
+            chunk = os.urandom(request).translate(table, delete)[:needed]
+            parts.append(chunk)
+            needed -= len(chunk)
+        return b''.join(parts)
+
+def export_chunks(batches, fmt='txt'):
+    """Encode batches of passwords as UTF-8 byte chunks in an export format.
+    
+    'txt' writes one password per line, 'ndjson' one JSON string per line
+    and 'csv' a single 'password' column with a header row. The format is
+    checked on the call, before any chunk is produced.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return _export_chunks(batches, fmt)
+
+def _export_chunks(batches, fmt):
+    if fmt == 'csv':
+        yield b'password\r\n'
+    for batch in batches:
+        if fmt == 'txt':
+            text = '\n'.join(batch) + '\n'
+        elif fmt == 'ndjson':
+            text = '\n'.join(map(json.dumps, batch)) + '\n'
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows((p,) for p in batch)
+            text = buffer.getvalue()
+        yield text.encode('utf-8')
+
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+def get_process_pool(processes):
+    """Shared, lazily started process pool with `processes` workers."""
+    with _process_pools_lock:
+        pool = _process_pools.get(processes)
+        if pool is None:
+            # spawn: never fork a process that is running server threads
+            pool = ProcessPoolExecutor(max_workers=processes,
+                                       mp_context=multiprocessing.get_context('spawn'))
+            _process_pools[processes] = pool
+        return pool
+
+def _bulk_worker(job):
+    """Process-pool entry point: one batch, drawn from the worker's own os.urandom."""
+    count, length, pool, class_pools = job
+    return PasswordGenerator._assemble_batch(SecureByteStream(), count, length, pool, class_pools)
+
+def _parallel_batches(processes, jobs):
+    """Run batch jobs on the process pool, yielding results in submission order.
+    
+    Only a few batches per worker are in flight at once, so arbitrarily
+    large runs keep constant memory.
+    """
+    executor = get_process_pool(processes)
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(_bulk_worker, job))
+        if len(pending) >= processes * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# Passphrase word lists
+PASSPHRASE_WORDS = (
+    'apple', 'brave', 'chair', 'dance', 'eagle', 'flame', 'grape', 'house',
+    'island', 'jungle', 'knife', 'light', 'moon', 'night', 'ocean', 'paper',
+    'queen', 'river', 'stone', 'tiger', 'uncle', 'voice', 'water', 'yellow',
+    'zebra', 'magic', 'power', 'dream', 'cloud', 'storm', 'peace', 'happy',
+    'strong', 'bright', 'quick', 'gentle', 'clever', 'silent', 'golden', 'silver'
+)
+PASSPHRASE_NUMBER_RANGE = 10000  # 4-digit suffix, worth log2(10000) bits
+
+class WordList:
+    """Immutable, sorted, de-duplicated word list in one compact buffer.
+    
+    Words are stored lower-cased and newline-joined in a single bytes object
+    with an array of start offsets, so a 100k-word list costs about 1 MB
+    instead of a Python list of 100k strings. Picking a word is one
+    secrets.randbelow and a slice; membership is a binary search.
+    """
+    
+    def __init__(self, words):
+        words = sorted({w.strip().lower() for w in words if w.strip()})
+        if len(words) < 2:
+            raise ValueError("A word list needs at least two distinct words")
+        self._blob = '\n'.join(words).encode('utf-8') + b'\n'
+        self._offsets = array('I', itertools.accumulate(
+            (len(w.encode('utf-8')) + 1 for w in words), initial=0))
+        self.bits_per_word = math.log2(len(words))
+    
+    @classmethod
+    def load(cls, path):
+        """Read a list with one word per line; diceware-style 'NNNNN word'
+        lines and '#' comments are understood."""
+        with open(path, encoding='utf-8') as f:
+            return cls(line.split()[-1] for line in f
+                       if line.strip() and not line.lstrip().startswith('#'))
+    
+    def __len__(self):
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return self._blob[self._offsets[index]:self._offsets[index + 1] - 1].decode('utf-8')
+    
+    def __contains__(self, word):
+        key = word.lower().encode('utf-8')
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._blob[self._offsets[mid]:self._offsets[mid + 1] - 1]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+        return False
+    
+    def choice(self):
+        """A uniformly random word from the list."""
+        return self[secrets.randbelow(len(self))]
+
+DEFAULT_WORD_LIST = WordList(PASSPHRASE_WORDS)
+
+# Strength analysis
+#
+# Every character is classified through lookup tables built once at import:
+# a byte table for the character classes and integer codes for sequence and
+# keyboard detection. A character is "predictable" when it continues a run
+# of three: a repeat (aaa), an alphabet/digit sequence (abc, 987) or a walk
+# along a keyboard row (qwe, ;lk). Predictable characters add no entropy
+# (any per-character credit lets long runs like aaaa... score as strong);
+# the rest are worth log2(pool size) each.
+LOWER, UPPER, DIGIT, SYMBOL, OTHER = 1, 2, 4, 8, 16
+CLASS_POOL_SIZES = {LOWER: 26, UPPER: 26, DIGIT: 10, SYMBOL: 33, OTHER: 128}
+STRENGTH_BATCH_LIMIT = 10000  # largest batch accepted by /api/strength
+STRENGTH_VECTOR_MIN = 64      # batches from this size use the NumPy path
+KEYBOARD_ROWS = (
+    ('1234567890-=', '!@#$%^&*()_+'),
+    ('qwertyuiop[]', 'QWERTYUIOP{}'),
+    ("asdfghjkl;'", 'ASDFGHJKL:"'),
+    ('zxcvbnm,./', 'ZXCVBNM<>?'),
+)
+PASSPHRASE_PATTERN = re.compile(r'[A-Za-z]+(?:[^A-Za-z0-9]+[A-Za-z]+)+(?:[^A-Za-z0-9]*\d+)?')
+STRENGTH_LEVELS = (
+    (80, 'Excellent', '#22c55e'),
+    (60, 'Very Strong', '#16a34a'),
+    (40, 'Strong', '#eab308'),
+    (25, 'Medium', '#f97316'),
+    (0, 'Weak', '#ef4444'),
+)
+
+def _build_strength_tables():
+    # Byte -> class bit; UTF-8 lead/continuation bytes count as OTHER
+    classes = bytearray([OTHER] * 256)
+    for chars, bit in ((string.ascii_lowercase, LOWER), (string.ascii_uppercase, UPPER),
+                       (string.digits, DIGIT), (string.punctuation + ' ', SYMBOL)):
+        for c in chars:
+            classes[ord(c)] = bit
+    # Codes whose neighbours differ by exactly 1 only inside a sequence or a
+    # keyboard row; every other character gets a code 3 apart from the rest.
+    sequence = [1000 + 3 * cp for cp in range(128)]
+    for c in string.ascii_letters + string.digits:
+        sequence[ord(c)] = ord(c.lower())
+    keyboard = [100000 + 3 * cp for cp in range(128)]
+    for row, variants in enumerate(KEYBOARD_ROWS):
+        for keys in variants:
+            for col, c in enumerate(keys):
+                keyboard[ord(c)] = row * 100 + col
+    return bytes(classes), sequence, keyboard
+
+CLASS_TABLE, SEQUENCE_CODES, KEYBOARD_CODES = _build_strength_tables()
+
+def _pattern_counts(password):
+    """(predictable chars, repeat?, sequence?, keyboard?) for one password."""
+    cps = [ord(c) for c in password]
+    seq = [SEQUENCE_CODES[cp] if cp < 128 else 1000 + 3 * cp for cp in cps]
+    kbd = [KEYBOARD_CODES[cp] if cp < 128 else 100000 + 3 * cp for cp in cps]
+    predictable = repeat = sequence = keyboard = 0
+    for i in range(2, len(cps)):
+        r = cps[i] == cps[i - 1] == cps[i - 2]
+        d = seq[i] - seq[i - 1]
+        s = (d == 1 or d == -1) and seq[i - 1] - seq[i - 2] == d
+        d = kbd[i] - kbd[i - 1]
+        k = (d == 1 or d == -1) and kbd[i - 1] - kbd[i - 2] == d
+        if r or s or k:
+            predictable += 1
+            repeat |= r
+            sequence |= s
+            keyboard |= k and not s  # 123 is both; report it as a sequence
+    return predictable, bool(repeat), bool(sequence), bool(keyboard)
+
+def _analyze_python(passwords):
+    results = []
+    for password in passwords:
+        mask = 0
+        for bit in set(password.encode('utf-8', 'surrogatepass').translate(CLASS_TABLE)):
+            mask |= bit
+        results.append((len(password), mask) + _pattern_counts(password))
+    return results
+
+def _analyze_numpy(passwords):
+    """Same metrics as _analyze_python, computed over the whole batch at once.
+    
+    The batch becomes one array of code points with a NUL in front of each
+    password; runs of three that touch a NUL are ignored. Returns None if a
+    password itself contains NUL.
+    """
+    n = len(passwords)
+    joined = '\0' + '\0'.join(passwords)
+    if joined.count('\0') != n:
+        return None
+    cp = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+    sentinel = cp == 0
+    owner = np.cumsum(sentinel) - 1
+    ascii_cp = np.minimum(cp, 127)
+    is_ascii = cp < 128
+    
+    classes = np.frombuffer(CLASS_TABLE, dtype=np.uint8)[ascii_cp]
+    classes = np.where(is_ascii, classes, OTHER)
+    classes[sentinel] = 0
+    mask = np.zeros(n, dtype=np.int64)
+    for bit in CLASS_POOL_SIZES:
+        present = np.bincount(owner, weights=(classes & bit) != 0, minlength=n) > 0
+        mask |= present * bit
+    lengths = np.bincount(owner, minlength=n) - 1
+    
+    def runs(codes, steps):
+        d = np.diff(codes)
+        return (d[1:] == d[:-1]) & np.isin(d[1:], steps)
+    
+    seq = np.where(is_ascii, np.asarray(SEQUENCE_CODES)[ascii_cp], 1000 + 3 * cp)
+    kbd = np.where(is_ascii, np.asarray(KEYBOARD_CODES)[ascii_cp], 100000 + 3 * cp)
+    valid = ~(sentinel[2:] | sentinel[1:-1] | sentinel[:-2])
+    repeat = runs(cp, (0,)) & valid
+    sequence = runs(seq, (1, -1)) & valid
+    keyboard = runs(kbd, (1, -1)) & valid & ~sequence
+    where = owner[2:]
+    
+    def per_password(hits):
+        return np.bincount(where[hits], minlength=n)
+    
+    predictable = per_password(repeat | sequence | keyboard)
+    flags = [per_password(hits) > 0 for hits in (repeat, sequence, keyboard)]
+    return list(zip(lengths.tolist(), mask.tolist(), predictable.tolist(),
+                    *(f.tolist() for f in flags)))
+
+def analyze_strength(passwords):
+    """Raw metrics per password: (length, class mask, predictable chars,
+    has repeat, has sequence, has keyboard walk)."""
+    if np is not None and len(passwords) >= STRENGTH_VECTOR_MIN:
+        results = _analyze_numpy(passwords)
+        if results is not None:
+            return results
+    return _analyze_python(passwords)
+
+def passphrase_entropy(password, words=DEFAULT_WORD_LIST):
+    """Entropy of a passphrase built from WordList `words`, or None if it is not one.
+    
+    A passphrase is two or more list words joined by separators, optionally
+    followed by a number; its strength is the number of words times
+    log2(len(words)), not the much larger per-character estimate.
+    """
+    if not PASSPHRASE_PATTERN.fullmatch(password):
+        return None
+    bits = 0.0
+    for token in re.findall(r'[A-Za-z]+|\d+', password):
+        if token.isdigit():
+            bits += len(token) * math.log2(10)
+        elif token in words:
+            bits += words.bits_per_word
+        else:
+            return None
+    return bits
+
+def strength_report(password, metrics, words=DEFAULT_WORD_LIST):
+    """Turn analyze_strength metrics into the score/category/feedback dict.
+    
+    The score is the entropy estimate in bits, capped at 100.
+    """
+    length, mask, predictable, repeat, sequence, keyboard = metrics
+    pool = sum(size for bit, size in CLASS_POOL_SIZES.items() if mask & bit)
+    entropy = (length - predictable) * math.log2(pool) if pool else 0.0
+    feedback = []
+    
+    phrase = passphrase_entropy(password, words)
+    if phrase is not None and phrase < entropy:
+        entropy = phrase
+        feedback.append(f"Passphrase from a {len(words)}-word list")
+    
+    if length >= 16:
+        feedback.append("Excellent length")
+    elif length >= 12:
+        feedback.append("Good length")
+    elif length >= 8:
+        feedback.append("Adequate length")
+    else:
+        feedback.append("Too short")
+    
+    char_types = bin(mask & (LOWER | UPPER | DIGIT | SYMBOL)).count('1')
+    feedback.append(("Poor variety", "Poor variety", "Fair variety",
+                     "Good variety", "Excellent variety")[char_types])
+    
+    patterns = [name for name, found in (('repeat', repeat), ('sequence', sequence),
+                                         ('keyboard', keyboard)) if found]
+    if repeat:
+        feedback.append("Contains repeated characters")
+    if sequence:
+        feedback.append("Contains a sequence like abc or 123")
+    if keyboard:
+        feedback.append("Contains a keyboard pattern like qwerty")
+    if length and not patterns and len(set(password)) == length:
+        feedback.append("No repeated characters")
+    
+    score = min(int(entropy), 100)
+    for threshold, category, color in STRENGTH_LEVELS:
+        if score >= threshold:
+            break
+    return {
+        'score': score,
+        'category': category,
+        'color': color,
+        'entropy': round(entropy, 1),
+        'patterns': patterns,
+        'feedback': feedback
+    }
+
+def mark_breached(report, breached):
+    """Add the breach verdict to a strength report; breached passwords score 0."""
+    report['breached'] = breached
+    if breached:
+        threshold, report['category'], report['color'] = STRENGTH_LEVELS[-1]
+        report['score'] = threshold
+        report['entropy'] = 0.0
+        report['feedback'].insert(0, "Found in a breached password list")
+    return report
+
+def score_passwords(passwords, words=DEFAULT_WORD_LIST):
+    """Strength reports for a whole batch of passwords."""
+    return [strength_report(p, m, words) for p, m in zip(passwords, analyze_strength(passwords))]
+
+# Breached-password index
+#
+# Layout: magic, record count, a fan-out table of 65537 record offsets keyed
+# by the first two digest bytes, then the sorted, de-duplicated first
+# BREACH_PREFIX_BYTES of SHA-1(password). A lookup reads two fan-out entries
+# and binary-searches one bucket (a handful of records) straight from the
+# mmap, so nothing is loaded up front. 64-bit prefixes keep false positives
+# below one in a billion even for lists of a billion passwords.
+BREACH_INDEX_MAGIC = b'PWBRIDX1'
+BREACH_PREFIX_BYTES = 8
+BREACH_FANOUT = 1 << 16
+BREACH_MAX_RETRIES = 100      # regenerations before generate_password gives up
+HIBP_LINE = re.compile(rb'[0-9A-Fa-f]{40}(?::\d+)?')
+
+class BreachIndex:
+    """Read-only, memory-mapped set of breached password hashes."""
+    
+    _header = struct.Struct('>8sQ')
+    _offset = struct.Struct('>Q')
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = (self._header.unpack_from(self._map, 0)
+                             if len(self._map) >= self._header.size else (b'', 0))
+        if magic != BREACH_INDEX_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a breach index (build one with `app.py breach-index`)")
+        self._records = self._header.size + (BREACH_FANOUT + 1) * self._offset.size
+    
+    def __len__(self):
+        return self.count
+    
+    def __contains__(self, password):
+        return self.contains_digest(hashlib.sha1(password.encode('utf-8', 'surrogatepass')).digest())
+    
+    def contains_digest(self, digest):
+        """True if the SHA-1 `digest` (or any prefix of 8+ bytes) is listed."""
+        key = digest[:BREACH_PREFIX_BYTES]
+        bucket = self._header.size + (key[0] << 8 | key[1]) * self._offset.size
+        lo = self._offset.unpack_from(self._map, bucket)[0]
+        hi = self._offset.unpack_from(self._map, bucket + self._offset.size)[0]
+        size = BREACH_PREFIX_BYTES
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._records + mid * size
+            record = self._map[start:start + size]
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+    
+    def close(self):
+        self._map.close()
+    
+    @staticmethod
+    def build(lines, path, hashed=False):
+        """Write an index from an iterable of byte lines; return the record count.
+        
+        Lines are plain passwords, or with `hashed` SHA-1 hex digests as in the
+        Have I Been Pwned downloads ('HEX:count'). Only 8 bytes per password
+        are held in memory while sorting.
+        """
+        prefixes = bytearray()
+        for line in lines:
+            line = line.rstrip(b'\r\n')
+            if hashed:
+                if HIBP_LINE.fullmatch(line):
+                    prefixes += bytes.fromhex(line[:2 * BREACH_PREFIX_BYTES].decode('ascii'))
+            elif line:
+                prefixes += hashlib.sha1(line).digest()[:BREACH_PREFIX_BYTES]
+        
+        if np is not None:
+            keys = np.unique(np.frombuffer(bytes(prefixes), dtype='>u8'))
+            records = keys.astype('>u8').tobytes()
+            buckets = (keys >> 48).astype(np.int64)
+            fanout = np.searchsorted(buckets, np.arange(BREACH_FANOUT + 1)).tolist()
+        else:
+            keys = sorted({bytes(prefixes[i:i + BREACH_PREFIX_BYTES])
+                           for i in range(0, len(prefixes), BREACH_PREFIX_BYTES)})
+            records = b''.join(keys)
+            counts = [0] * BREACH_FANOUT
+            for key in keys:
+                counts[key[0] << 8 | key[1]] += 1
+            fanout = [0, *itertools.accumulate(counts)]
+        del prefixes
+        
+        count = len(records) // BREACH_PREFIX_BYTES
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(BreachIndex._header.pack(BREACH_INDEX_MAGIC, count))
+            f.write(struct.pack(f'>{BREACH_FANOUT + 1}Q', *fanout))
+            f.write(records)
+        os.replace(tmp, path)
+        return count
+
+OptionProfile = namedtuple('OptionProfile', 'pool class_pools pool_bytes class_pool_bytes')
 
 class PasswordGenerator:
-    """Advanced password generator with multiple security features."""
+    """Advanced password generator with multiple security features.
+    
+    Instances hold no per-call state, so one generator can serve every
+    thread of the web server.
+    """
     
-    def __init__(self):
+    def __init__(self, breach_index=None, word_list=None):
+        self.breach_index = breach_index
+        self.word_list = word_list or DEFAULT_WORD_LIST
         self.char_sets = {
             'lowercase': string.ascii_lowercase,
             'uppercase': string.ascii_uppercase,
@@ -37,10 +572,28 @@ class PasswordGenerator:
             'numbers': '23456789',                      # Removed: 0, 1
             'symbols': '!@#$%^&*()_+-=[]{}|;:,.<>?'
         }
+        
+        # Compiled character pools per option combination (thread-safe LRU)
+        self.profile = lru_cache(maxsize=PROFILE_CACHE_SIZE)(self._build_profile)
+    
+    def _build_profile(self, include_lowercase, include_uppercase, include_numbers,
+                       include_symbols, exclude_similar):
+        """Character pools for one combination of options; call via profile()."""
+        char_sets = self.readable_sets if exclude_similar else self.char_sets
+        selected = tuple(char_sets[name] for name, enabled in (
+            ('lowercase', include_lowercase), ('uppercase', include_uppercase),
+            ('numbers', include_numbers), ('symbols', include_symbols)) if enabled)
+        if not selected:
+            raise ValueError("At least one character type must be selected")
+        
+        pool = ''.join(selected)
+        pool_bytes = pool.encode('ascii')
+        _sampling_table(pool_bytes)  # warm the bulk sampler's lookup table
+        return OptionProfile(pool, selected, pool_bytes, tuple(c.encode('ascii') for c in selected))
     
     def generate_password(self, length=12, include_lowercase=True, include_uppercase=True,
                          include_numbers=True, include_symbols=True, exclude_similar=False,
-                         ensure_each_type=True):
+                         ensure_each_type=True, reject_breached=False):
         """
         Generate a secure password with specified criteria.
         
@@ -52,6 +605,7 @@ class PasswordGenerator:
             include_symbols (bool): Include symbols
             exclude_similar (bool): Exclude similar-looking characters
             ensure_each_type (bool): Ensure at least one char from each selected type
+            reject_breached (bool): Regenerate passwords found in the breach index
         
         Returns:
             str: Generated password
@@ -59,302 +613,302 @@ class PasswordGenerator:
         if length < 4 or length > 100:
             raise ValueError("Password length must be between 4 and 100 characters")
         
-        # Choose character sets based on options
-        char_sets = self.readable_sets if exclude_similar else self.char_sets
-        
-        # Build character pool
-        char_pool = ''
-        selected_sets = []
-        
-        if include_lowercase:
-            char_pool += char_sets['lowercase']
-            selected_sets.append(('lowercase', char_sets['lowercase']))
-        if include_uppercase:
-            char_pool += char_sets['uppercase']
-            selected_sets.append(('uppercase', char_sets['uppercase']))
-        if include_numbers:
-            char_pool += char_sets['numbers']
-            selected_sets.append(('numbers', char_sets['numbers']))
-        if include_symbols:
-            char_pool += char_sets['symbols']
-            selected_sets.append(('symbols', char_sets['symbols']))
-        
-        if not char_pool:
-            raise ValueError("At least one character type must be selected")
+        profile = self.profile(bool(include_lowercase), bool(include_uppercase),
+                               bool(include_numbers), bool(include_symbols), bool(exclude_similar))
         
-        # Generate password
+        for _ in range(BREACH_MAX_RETRIES):
+            password = self._draw_password(length, profile, ensure_each_type)
+            if not (reject_breached and self.is_breached(password)):
+                return password
+        raise ValueError("Could not generate a password that is not in the breach index; "
+                         "allow more characters or a longer length")
+    
+    def _draw_password(self, length, profile, ensure_each_type):
+        """One candidate password from an option profile's character pools."""
         password = []
         
         # Ensure at least one character from each selected type
-        if ensure_each_type and selected_sets:
-            for name, charset in selected_sets:
+        if ensure_each_type:
+            for charset in profile.class_pools:
                 password.append(secrets.choice(charset))
         
         # Fill remaining length with random characters
         remaining_length = length - len(password)
         for _ in range(remaining_length):
-            password.append(secrets.choice(char_pool))
+            password.append(secrets.choice(profile.pool))
         
         # Shuffle to avoid predictable patterns
-        secrets.SystemRandom().shuffle(password)
+        _system_random.shuffle(password)
         
         return ''.join(password)
     
+    def is_breached(self, password):
+        """True if the password is in the breach index (False without one)."""
+        return self.breach_index is not None and password in self.breach_index
+    
     def generate_multiple_passwords(self, count=5, **kwargs):
         """Generate multiple passwords with the same criteria."""
         if count < 1 or count > 50:
             raise ValueError("Count must be between 1 and 50")
         
+        return self.generate_bulk(count, **kwargs)
+    
+    def generate_bulk(self, count, **kwargs):
+        """Generate `count` passwords (no upper limit) as a list.
+        
+        Accepts the same keyword options as generate_password() (plus
+        iter_bulk()'s `processes`) and keeps the same guarantees, but draws
+        randomness in blocks and assembles whole batches at once.
+        """
         passwords = []
-        for _ in range(count):
-            passwords.append(self.generate_password(**kwargs))
+        for chunk in self.iter_bulk(count, **kwargs):
+            passwords.extend(chunk)
         return passwords
     
-    def calculate_strength(self, password):
-        """Calculate password strength score and category."""
-        score = 0
-        feedback = []
-        
-        # Length scoring
-        length = len(password)
-        if length >= 16:
-            score += 30
-            feedback.append("Excellent length")
-        elif length >= 12:
-            score += 25
-            feedback.append("Good length")
-        elif length >= 8:
-            score += 15
-            feedback.append("Adequate length")
-        else:
-            score += 5
-            feedback.append("Too short")
-        
-        # Character variety scoring
-        has_lower = any(c.islower() for c in password)
-        has_upper = any(c.isupper() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_symbol = any(c in string.punctuation for c in password)
-        
-        char_types = sum([has_lower, has_upper, has_digit, has_symbol])
-        score += char_types * 15
-        
-        if char_types >= 4:
-            feedback.append("Excellent variety")
-        elif char_types >= 3:
-            feedback.append("Good variety")
-        elif char_types >= 2:
-            feedback.append("Fair variety")
-        else:
-            feedback.append("Poor variety")
-        
-        # Additional complexity bonuses
-        if length >= 20:
-            score += 10
-        if char_types == 4:
-            score += 5
-        
-        # No repeated characters bonus
-        if len(set(password)) == len(password):
-            score += 5
-            feedback.append("No repeated characters")
-        
-        # Determine strength category
-        if score >= 80:
-            return {
-                'score': min(score, 100),
-                'category': 'Excellent',
-                'color': '#22c55e',
-                'feedback': feedback
-            }
-        elif score >= 60:
-            return {
-                'score': score,
-                'category': 'Very Strong',
-                'color': '#16a34a',
-                'feedback': feedback
-            }
-        elif score >= 40:
-            return {
-                'score': score,
-                'category': 'Strong',
-                'color': '#eab308',
-                'feedback': feedback
-            }
-        elif score >= 25:
-            return {
-                'score': score,
-                'category': 'Medium',
-                'color': '#f97316',
-                'feedback': feedback
-            }
+    def iter_bulk(self, count, chunk_size=BULK_CHUNK_SIZE, stream=None, processes=1, **kwargs):
+        """Yield lists of passwords, at most `chunk_size` at a time, `count` in total.
+        
+        With processes > 1 the batches are generated on a process pool and
+        yielded in order; each worker draws from its own os.urandom stream.
+        Options are validated on the call, so a ValueError comes before any
+        output is written, not from the first next().
+        """
+        if count < 1:
+            raise ValueError("Count must be at least 1")
+        length, pool, class_pools = self._bulk_spec(**kwargs)
+        return self._bulk_batches(count, chunk_size, stream, processes, length, pool, class_pools)
+    
+    def _bulk_batches(self, count, chunk_size, stream, processes, length, pool, class_pools):
+        if processes > 1:
+            # Enough batches to keep every worker busy, but not tiny ones
+            per_worker = -(-count // (processes * 4))
+            chunk_size = min(chunk_size, max(PARALLEL_MIN_CHUNK, per_worker))
+        sizes = (min(chunk_size, count - start) for start in range(0, count, chunk_size))
+        if processes > 1:
+            batches = _parallel_batches(processes, ((n, length, pool, class_pools) for n in sizes))
         else:
-            return {
-                'score': score,
-                'category': 'Weak',
-                'color': '#ef4444',
-                'feedback': feedback
-            }
+            stream = stream or SecureByteStream()
+            batches = (self._assemble_batch(stream, n, length, pool, class_pools) for n in sizes)
+        for data in batches:
+            yield [data[i:i + length].decode('ascii') for i in range(0, len(data), length)]
+    
+    def _bulk_spec(self, length=12, include_lowercase=True, include_uppercase=True,
+                   include_numbers=True, include_symbols=True, exclude_similar=False,
+                   ensure_each_type=True):
+        """Validate bulk options; return (length, pool, required class pools) as bytes."""
+        if length < 4 or length > 100:
+            raise ValueError("Password length must be between 4 and 100 characters")
+        
+        profile = self.profile(bool(include_lowercase), bool(include_uppercase),
+                               bool(include_numbers), bool(include_symbols), bool(exclude_similar))
+        class_pools = list(profile.class_pool_bytes) if ensure_each_type else []
+        return length, profile.pool_bytes, class_pools
+    
+    @staticmethod
+    def _assemble_batch(stream, count, length, pool, class_pools):
+        """Return `count` passwords of `length` characters, concatenated.
+        
+        Each password holds one character from every required class plus
+        `length - len(class_pools)` characters from the whole pool, in a
+        uniformly random order - the same distribution generate_password()
+        produces by shuffling.
+        """
+        k = len(class_pools)
+        fill_length = length - k
+        required = [stream.sample(cls, count) for cls in class_pools]
+        
+        if np is not None:
+            # Fill every position from the pool, then overwrite k distinct
+            # positions chosen by a vectorised partial Fisher-Yates shuffle.
+            rows = np.arange(count)
+            matrix = np.frombuffer(stream.sample(pool, count * length), dtype=np.uint8)
+            matrix = matrix.reshape(count, length).copy()
+            order = np.tile(np.arange(length, dtype=np.uint8), (count, 1))
+            for j in range(k):
+                pick = j + np.frombuffer(stream.sample(bytes(range(length - j)), count), dtype=np.uint8)
+                chosen = order[rows, pick].copy()
+                order[rows, pick] = order[rows, j]
+                order[rows, j] = chosen
+            for j in range(k):
+                matrix[rows, order[:, j]] = np.frombuffer(required[j], dtype=np.uint8)
+            return matrix.tobytes()
+        
+        # Pure Python: insert each required character at a uniformly random
+        # slot, which yields a uniformly random arrangement.
+        fill = stream.sample(pool, count * fill_length)
+        slots = [stream.sample(bytes(range(fill_length + j + 1)), count) for j in range(k)]
+        out = bytearray()
+        for i in range(count):
+            password = bytearray(fill[i * fill_length:(i + 1) * fill_length])
+            for j in range(k):
+                password.insert(slots[j][i], required[j][i])
+            out += password
+        return bytes(out)
+    
+    def calculate_strength(self, password, check_breached=False):
+        """Calculate password strength score, entropy and category.
+        
+        With `check_breached` (and a breach index) a listed password scores 0.
+        """
+        report = strength_report(password, _analyze_python([password])[0], self.word_list)
+        if check_breached and self.breach_index is not None:
+            report = mark_breached(report, self.is_breached(password))
+        return report
+    
+    def calculate_strength_batch(self, passwords, check_breached=False):
+        """Score many passwords in one call (audit jobs); vectorised with NumPy."""
+        passwords = list(passwords)
+        reports = score_passwords(passwords, self.word_list)
+        if check_breached and self.breach_index is not None:
+            reports = [mark_breached(r, self.is_breached(p)) for r, p in zip(reports, passwords)]
+        return reports
     
     def generate_passphrase(self, word_count=4, separator='-', capitalize=True):
-        """Generate a memorable passphrase using common words."""
-        # Simple word list for passphrases
-        words = [
-            'apple', 'brave', 'chair', 'dance', 'eagle', 'flame', 'grape', 'house',
-            'island', 'jungle', 'knife', 'light', 'moon', 'night', 'ocean', 'paper',
-            'queen', 'river', 'stone', 'tiger', 'uncle', 'voice', 'water', 'yellow',
-            'zebra', 'magic', 'power', 'dream', 'cloud', 'storm', 'peace', 'happy',
-            'strong', 'bright', 'quick', 'gentle', 'clever', 'silent', 'golden', 'silver'
-        ]
+        """Generate a memorable passphrase from the word list."""
+        if word_count < 1 or word_count > 20:
+            raise ValueError("Word count must be between 1 and 20")
         
         selected_words = []
         for _ in range(word_count):
-            word = secrets.choice(words)
+            word = self.word_list.choice()
             if capitalize:
                 word = word.capitalize()
             selected_words.append(word)
         
         # Add some numbers for extra security
         passphrase = separator.join(selected_words)
-        passphrase += separator + str(secrets.randbelow(9999)).zfill(4)
+        passphrase += separator + str(secrets.randbelow(PASSPHRASE_NUMBER_RANGE)).zfill(4)
         
         return passphrase
+    
+    def passphrase_entropy(self, word_count=4):
+        """Bits of entropy of a generate_passphrase result with `word_count` words."""
+        return word_count * self.word_list.bits_per_word + math.log2(PASSPHRASE_NUMBER_RANGE)
 
-class WebPasswordHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for the web interface."""
+class RequestError(ValueError):
+    """A client error that maps to a specific HTTP status."""
     
-    def __init__(self, *args, **kwargs):
-        self.password_gen = PasswordGenerator()
-        super().__init__(*args, **kwargs)
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Request metrics
+METRIC_ENDPOINTS = frozenset({
+    '/', '/index.html', '/metrics', '/api/test', '/api/generate', '/api/bulk',
+    '/api/bulk/stream', '/api/passphrase', '/api/strength', '/api/check',
+})
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestMetrics:
+    """Per-endpoint request counters and latency histograms.
     
-    def do_GET(self):
-        """Handle GET requests - serve the main page or static content."""
-        if self.path == '/' or self.path == '/index.html':
-            self.serve_main_page()
-        elif self.path == '/api/test':
-            self.send_json_response({'status': 'OK', 'message': 'API is working'})
-        else:
-            self.send_error(404, "Page not found")
+    Rendered in the Prometheus text format on /metrics. Each server process
+    keeps its own numbers (series carry a `worker` pid label), so with
+    --workers a scrape reports the process that answered it.
+    """
     
-    def do_POST(self):
-        """Handle POST requests - API endpoints."""
-        if self.path == '/api/generate':
-            self.handle_generate_api()
-        elif self.path == '/api/bulk':
-            self.handle_bulk_generate_api()
-        elif self.path == '/api/passphrase':
-            self.handle_passphrase_api()
-        else:
-            self.send_error(404, "API endpoint not found")
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}   # (method, endpoint, status) -> count
+        self._latency = {}    # endpoint -> [per-bucket counts..., +Inf count, sum]
+        self.rejected = 0
     
-    def handle_generate_api(self):
-        """Handle single password generation API."""
-        try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            # Extract parameters with defaults
-            length = int(data.get('length', 12))
-            include_lowercase = data.get('lowercase', True)
-            include_uppercase = data.get('uppercase', True)
-            include_numbers = data.get('numbers', True)
-            include_symbols = data.get('symbols', True)
-            exclude_similar = data.get('exclude_similar', False)
-            
-            # Generate password
-            password = self.password_gen.generate_password(
-                length=length,
-                include_lowercase=include_lowercase,
-                include_uppercase=include_uppercase,
-                include_numbers=include_numbers,
-                include_symbols=include_symbols,
-                exclude_similar=exclude_similar
-            )
-            
-            # Calculate strength
-            strength = self.password_gen.calculate_strength(password)
-            
-            response = {
-                'password': password,
-                'strength': strength,
-                'length': len(password)
-            }
-            
-            self.send_json_response(response)
-            
-        except Exception as e:
-            self.send_json_response({'error': str(e)}, status=400)
+    def observe(self, method, path, status, seconds):
+        """Record one finished request."""
+        endpoint = path.split('?', 1)[0]
+        if endpoint not in METRIC_ENDPOINTS:
+            endpoint = 'other'  # keeps label cardinality bounded
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            key = (method, endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                histogram = self._latency[endpoint] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[slot] += 1
+            histogram[-1] += seconds
     
-    def handle_bulk_generate_api(self):
-        """Handle bulk password generation API."""
-        try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            count = int(data.get('count', 5))
-            
-            # Generate multiple passwords
-            passwords = self.password_gen.generate_multiple_passwords(
-                count=count,
-                length=int(data.get('length', 12)),
-                include_lowercase=data.get('lowercase', True),
-                include_uppercase=data.get('uppercase', True),
-                include_numbers=data.get('numbers', True),
-                include_symbols=data.get('symbols', True),
-                exclude_similar=data.get('exclude_similar', False)
-            )
-            
-            response = {'passwords': passwords}
-            self.send_json_response(response)
-            
-        except Exception as e:
-            self.send_json_response({'error': str(e)}, status=400)
+    def reject(self):
+        """Count a connection turned away with 503 because the pool was full."""
+        with self._lock:
+            self.rejected += 1
     
-    def handle_passphrase_api(self):
-        """Handle passphrase generation API."""
-        try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            word_count = int(data.get('word_count', 4))
-            separator = data.get('separator', '-')
-            capitalize = data.get('capitalize', True)
-            
-            passphrase = self.password_gen.generate_passphrase(
-                word_count=word_count,
-                separator=separator,
-                capitalize=capitalize
-            )
-            
-            strength = self.password_gen.calculate_strength(passphrase)
-            
-            response = {
-                'passphrase': passphrase,
-                'strength': strength,
-                'length': len(passphrase)
-            }
-            
-            self.send_json_response(response)
-            
-        except Exception as e:
-            self.send_json_response({'error': str(e)}, status=400)
+    def render(self):
+        """The current values in Prometheus text exposition format."""
+        worker = os.getpid()
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted((endpoint, list(h)) for endpoint, h in self._latency.items())
+            rejected = self.rejected
+        
+        lines = ['# HELP password_generator_requests_total Requests handled, by endpoint and status.',
+                 '# TYPE password_generator_requests_total counter']
+        for (method, endpoint, status), count in requests:
+            lines.append(f'password_generator_requests_total{{worker="{worker}",method="{method}",'
+                         f'endpoint="{endpoint}",status="{status}"}} {count}')
+        
+        lines += ['# HELP password_generator_request_duration_seconds Time to handle a request.',
+                  '# TYPE password_generator_request_duration_seconds histogram']
+        for endpoint, histogram in latency:
+            labels = f'worker="{worker}",endpoint="{endpoint}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(f'password_generator_request_duration_seconds_bucket'
+                             f'{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'password_generator_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}')
+            lines.append(f'password_generator_request_duration_seconds_count{{{labels}}} {cumulative}')
+        
+        lines += ['# HELP password_generator_rejected_connections_total Connections refused with 503 '
+                  'because every worker thread and queue slot was busy.',
+                  '# TYPE password_generator_rejected_connections_total counter',
+                  f'password_generator_rejected_connections_total{{worker="{worker}"}} {rejected}']
+        return '\n'.join(lines) + '\n'
+
+METRICS = RequestMetrics()
+
+class StaticAsset:
+    """A static response body encoded and compressed once, at startup.
     
-    def send_json_response(self, data, status=200):
-        """Send JSON response."""
-        self.send_response(status)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode('utf-8'))
+    Each encoding gets its own strong ETag (the representations differ
+    byte-for-byte). `no-cache` makes browsers revalidate on every visit,
+    which costs a 304 header exchange instead of the body.
+    """
     
-    def serve_main_page(self):
-        """Serve the main HTML page."""
-        html_content = '''<!DOCTYPE html>
+    def __init__(self, text, content_type, cache_control='no-cache'):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.variants = {'identity': (raw, self.etag)}
+        self.variants['gzip'] = (gzip.compress(raw, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(raw, quality=11), f'"{digest}-br"')
+        self._etags = {etag for _, etag in self.variants.values()}
+    
+    def matches(self, if_none_match):
+        """Return the ETag an If-None-Match header names, or None if none match."""
+        if if_none_match.strip() == '*':
+            return self.etag
+        for tag in if_none_match.split(','):
+            tag = tag.strip().removeprefix('W/')
+            if tag in self._etags:
+                return tag
+        return None
+    
+    def select(self, accept_encoding):
+        """Pick (encoding, body, etag): brotli, then gzip, then identity."""
+        accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')
+                    if not part.replace(' ', '').endswith(';q=0')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return (encoding, *self.variants[encoding])
+        return ('identity', *self.variants['identity'])
+
+MAIN_PAGE_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -932,19 +1486,341 @@ class WebPasswordHandler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>'''
+
+MAIN_PAGE = StaticAsset(MAIN_PAGE_HTML, 'text/html; charset=utf-8')
+
+class WebPasswordHandler(BaseHTTPRequestHandler):
+    """HTTP request handler for the web interface."""
+    
+    # HTTP/1.1 keeps connections open between requests; every response
+    # therefore carries a Content-Length, and idle sockets time out.
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are separate writes; without TCP_NODELAY the body
+    # waits for the client's delayed ACK (~40 ms per keep-alive request).
+    disable_nagle_algorithm = True
+    
+    # Process pool size for large bulk requests (1 = generate in-process)
+    bulk_processes = 1
+    
+    @property
+    def password_gen(self):
+        """The PasswordGenerator shared by every request on this server."""
+        return self.server.password_gen
+    
+    def read_json(self, limit=MAX_BODY_SIZE):
+        """Read and decode the JSON request body, refusing bodies over `limit` bytes.
+        
+        Oversized bodies are rejected from the Content-Length header alone,
+        before anything is read; slow senders are cut off by `timeout`.
+        """
+        try:
+            content_length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self.close_connection = True  # an unframed body cannot be skipped
+            raise RequestError(411, "A valid Content-Length header is required")
+        if content_length < 0 or content_length > limit:
+            self.close_connection = True  # the unread body would corrupt the next request
+            raise RequestError(413, f"Request body must be at most {limit} bytes")
+        post_data = self.rfile.read(content_length)
+        data = json.loads(post_data.decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+    
+    def do_GET(self):
+        """Handle GET requests - serve the main page or static content."""
+        self.status = 0  # stays 0 if the handler fails before responding
+        start = time.perf_counter()
+        try:
+            if self.path == '/' or self.path == '/index.html':
+                self.serve_main_page()
+            elif self.path == '/api/test':
+                self.send_json_response({'status': 'OK', 'message': 'API is working'})
+            elif self.path == '/metrics':
+                self.send_metrics()
+            else:
+                self.send_error(404, "Page not found")
+        finally:
+            METRICS.observe('GET', self.path, self.status, time.perf_counter() - start)
+    
+    def do_POST(self):
+        """Handle POST requests - API endpoints."""
+        self.status = 0  # stays 0 if the handler fails before responding
+        start = time.perf_counter()
+        try:
+            if self.path == '/api/generate':
+                self.handle_generate_api()
+            elif self.path == '/api/bulk':
+                self.handle_bulk_generate_api()
+            elif self.path == '/api/bulk/stream':
+                self.handle_bulk_stream_api()
+            elif self.path == '/api/passphrase':
+                self.handle_passphrase_api()
+            elif self.path == '/api/strength':
+                self.handle_strength_api()
+            elif self.path == '/api/check':
+                self.handle_check_api()
+            else:
+                self.send_error(404, "API endpoint not found")
+        finally:
+            METRICS.observe('POST', self.path, self.status, time.perf_counter() - start)
+    
+    def handle_generate_api(self):
+        """Handle single password generation API."""
+        try:
+            data = self.read_json()
+            
+            # Extract parameters with defaults
+            length = int(data.get('length', 12))
+            include_lowercase = data.get('lowercase', True)
+            include_uppercase = data.get('uppercase', True)
+            include_numbers = data.get('numbers', True)
+            include_symbols = data.get('symbols', True)
+            exclude_similar = data.get('exclude_similar', False)
+            
+            # Generate password
+            password = self.password_gen.generate_password(
+                length=length,
+                include_lowercase=include_lowercase,
+                include_uppercase=include_uppercase,
+                include_numbers=include_numbers,
+                include_symbols=include_symbols,
+                exclude_similar=exclude_similar,
+                reject_breached=data.get('reject_breached', True)
+            )
+            
+            # Calculate strength
+            strength = self.password_gen.calculate_strength(password)
+            
+            response = {
+                'password': password,
+                'strength': strength,
+                'length': len(password)
+            }
+            
+            self.send_json_response(response)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+    
+    def handle_bulk_generate_api(self):
+        """Handle bulk password generation API."""
+        try:
+            data = self.read_json()
+            
+            count = int(data.get('count', 5))
+            if count < 1 or count > API_BULK_LIMIT:
+                raise ValueError(f"Count must be between 1 and {API_BULK_LIMIT}")
+            
+            # Generate multiple passwords
+            passwords = self.password_gen.generate_bulk(
+                count,
+                processes=self.processes_for(count),
+                length=int(data.get('length', 12)),
+                include_lowercase=data.get('lowercase', True),
+                include_uppercase=data.get('uppercase', True),
+                include_numbers=data.get('numbers', True),
+                include_symbols=data.get('symbols', True),
+                exclude_similar=data.get('exclude_similar', False)
+            )
+            
+            response = {'passwords': passwords}
+            self.send_json_response(response)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+    
+    def handle_passphrase_api(self):
+        """Handle passphrase generation API."""
+        try:
+            data = self.read_json()
+            
+            word_count = int(data.get('word_count', 4))
+            separator = data.get('separator', '-')
+            capitalize = data.get('capitalize', True)
+            
+            passphrase = self.password_gen.generate_passphrase(
+                word_count=word_count,
+                separator=separator,
+                capitalize=capitalize
+            )
+            
+            strength = self.password_gen.calculate_strength(passphrase)
+            
+            response = {
+                'passphrase': passphrase,
+                'strength': strength,
+                'length': len(passphrase),
+                'entropy': round(self.password_gen.passphrase_entropy(word_count), 1),
+                'word_list_size': len(self.password_gen.word_list)
+            }
+            
+            self.send_json_response(response)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+    
+    def handle_strength_api(self):
+        """Score one password ({"password": ...}) or a batch ({"passwords": [...]})."""
+        try:
+            data = self.read_json(MAX_BATCH_BODY_SIZE)
+            
+            if 'passwords' in data:
+                passwords = data['passwords']
+                if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+                    raise ValueError("passwords must be a list of strings")
+                if len(passwords) > STRENGTH_BATCH_LIMIT:
+                    raise ValueError(f"At most {STRENGTH_BATCH_LIMIT} passwords per request")
+                response = {'results': self.password_gen.calculate_strength_batch(
+                    passwords, check_breached=data.get('check_breached', True))}
+            else:
+                password = data.get('password')
+                if not isinstance(password, str):
+                    raise ValueError("password must be a string")
+                response = {'strength': self.password_gen.calculate_strength(
+                    password, check_breached=data.get('check_breached', True))}
+            
+            self.send_json_response(response)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+    
+    def handle_check_api(self):
+        """Look passwords up in the breach index: {"password": ...} or {"passwords": [...]}."""
+        breach_index = self.password_gen.breach_index
+        try:
+            # Read the body even when refusing, or it is parsed as the next request
+            data = self.read_json(MAX_BATCH_BODY_SIZE)
+            if breach_index is None:
+                raise RequestError(503, "No breach index loaded (start with --breach-index)")
+            
+            if 'passwords' in data:
+                passwords = data['passwords']
+                if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+                    raise ValueError("passwords must be a list of strings")
+                if len(passwords) > STRENGTH_BATCH_LIMIT:
+                    raise ValueError(f"At most {STRENGTH_BATCH_LIMIT} passwords per request")
+                response = {'breached': [p in breach_index for p in passwords]}
+            else:
+                password = data.get('password')
+                if not isinstance(password, str):
+                    raise ValueError("password must be a string")
+                response = {'breached': password in breach_index}
+            
+            self.send_json_response(response)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+    
+    def handle_bulk_stream_api(self):
+        """Stream bulk passwords as chunked NDJSON, CSV or plain text.
+        
+        Passwords are generated and sent batch by batch, so memory use does
+        not grow with `count` and the client receives data immediately.
+        """
+        try:
+            data = self.read_json()
+            
+            count = int(data.get('count', 1000))
+            if count < 1 or count > STREAM_BULK_LIMIT:
+                raise ValueError(f"Count must be between 1 and {STREAM_BULK_LIMIT}")
+            fmt = data.get('format', 'ndjson')
+            batches = self.password_gen.iter_bulk(
+                count,
+                processes=self.processes_for(count),
+                length=int(data.get('length', 12)),
+                include_lowercase=data.get('lowercase', True),
+                include_uppercase=data.get('uppercase', True),
+                include_numbers=data.get('numbers', True),
+                include_symbols=data.get('symbols', True),
+                exclude_similar=data.get('exclude_similar', False)
+            )
+            chunks = export_chunks(batches, fmt)
+            first = next(chunks)
+            
+        except Exception as e:
+            self.send_json_response({'error': str(e)}, status=getattr(e, 'status', 400))
+            return
         
         self.send_response(200)
-        self.send_header('Content-type', 'text/html')
+        self.send_header('Content-type', EXPORT_FORMATS[fmt])
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+        try:
+            for chunk in itertools.chain([first], chunks):
+                self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        except OSError:
+            # Gone (broken pipe, reset) or stalled past `timeout`
+            self.close_connection = True
+    
+    def processes_for(self, count):
+        """Use the process pool only for bulk requests big enough to benefit."""
+        return self.bulk_processes if count >= PARALLEL_MIN_COUNT else 1
+    
+    def send_json_response(self, data, status=200):
+        """Send JSON response."""
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        body = json.dumps(data, indent=2).encode('utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_response(self, code, message=None):
+        """Send the status line, remembering the code for the metrics."""
+        self.status = code
+        super().send_response(code, message)
+    
+    def send_metrics(self):
+        """Serve the request metrics in Prometheus text format."""
+        body = METRICS.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def serve_main_page(self):
+        """Serve the main HTML page from its prebuilt, precompressed copies."""
+        self.serve_static(MAIN_PAGE)
+    
+    def serve_static(self, asset):
+        """Send a StaticAsset, honouring If-None-Match and Accept-Encoding."""
+        matched = asset.matches(self.headers.get('If-None-Match', ''))
+        if matched:
+            self.send_response(304)
+            self.send_header('ETag', matched)
+            self.send_header('Cache-Control', asset.cache_control)
+            self.end_headers()
+            return
+        
+        encoding, body, etag = asset.select(self.headers.get('Accept-Encoding', ''))
+        self.send_response(200)
+        self.send_header('Content-type', asset.content_type)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', asset.cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        self.wfile.write(body)
     
     def log_message(self, format, *args):
         """Override to reduce console output."""
         return
 
-def run_command_line_interface():
+def run_command_line_interface(breach_index=None, word_list=None):
     """Run the command-line interface for password generation."""
-    password_gen = PasswordGenerator()
+    password_gen = PasswordGenerator(breach_index=breach_index, word_list=word_list)
     
     print("🔐 Python Password Generator - Command Line Interface")
     print("=" * 60)
@@ -977,7 +1853,8 @@ def run_command_line_interface():
                     include_uppercase=uppercase,
                     include_numbers=numbers,
                     include_symbols=symbols,
-                    exclude_similar=exclude_similar
+                    exclude_similar=exclude_similar,
+                    reject_breached=True
                 )
                 
                 strength = password_gen.calculate_strength(password)
@@ -1021,17 +1898,19 @@ def run_command_line_interface():
                     capitalize=capitalize
                 )
                 
-                strength = password_gen.calculate_strength(passphrase)
+                strength = password_gen.calculate_strength(passphrase, check_breached=True)
                 
                 print(f"\n{'='*60}")
                 print(f"Generated Passphrase: {passphrase}")
                 print(f"Length: {len(passphrase)} characters")
+                print(f"Entropy: {password_gen.passphrase_entropy(word_count):.1f} bits "
+                      f"({len(password_gen.word_list)}-word list)")
                 print(f"Strength: {strength['category']} ({strength['score']}/100)")
                 print(f"{'='*60}")
                 
             elif choice == '4':
                 # Start web interface
-                start_web_server()
+                start_web_server(breach_index=breach_index, word_list=word_list)
                 break
                 
             elif choice == '5':
@@ -1049,57 +1928,248 @@ def run_command_line_interface():
         except Exception as e:
             print(f"An error occurred: {e}")
 
-def start_web_server(port=8080):
-    """Start the web server."""
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that hands connections to a fixed pool of worker threads.
+    
+    At most `threads` connections are served at once and up to `queue_size`
+    more wait for a free thread. Beyond that, new connections get an
+    immediate 503 instead of piling up behind a slow client.
+    """
+    
+    def __init__(self, server_address, handler_class, threads=DEFAULT_THREADS,
+                 queue_size=DEFAULT_QUEUE_SIZE, password_gen=None):
+        self.request_queue_size = queue_size  # listen() backlog
+        self.password_gen = password_gen or PasswordGenerator()
+        self.threads = threads
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(threads + queue_size)
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker thread, or reject it when full."""
+        if not self._slots.acquire(blocking=False):
+            METRICS.reject()
+            try:
+                request.sendall(b'HTTP/1.1 503 Service Unavailable\r\n'
+                                b'Retry-After: 1\r\nContent-Length: 0\r\n'
+                                b'Connection: close\r\n\r\n')
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        if self._pool is None:
+            # Created lazily so forked workers each start their own threads
+            self._pool = ThreadPoolExecutor(max_workers=self.threads,
+                                            thread_name_prefix='http-worker')
+        self._pool.submit(self._process_request_thread, request, client_address)
+    
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+    
+    def server_close(self):
+        super().server_close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+def start_web_server(port=8080, workers=1, threads=DEFAULT_THREADS,
+                     queue_size=DEFAULT_QUEUE_SIZE, open_browser=True, bulk_processes=1,
+                     breach_index=None, word_list=None):
+    """Start the web server.
+    
+    Args:
+        port (int): Port to listen on (the next one is tried if it is taken)
+        workers (int): Processes sharing the listening socket (needs os.fork)
+        threads (int): Worker threads per process
+        queue_size (int): Connections allowed to wait for a free thread
+        open_browser (bool): Open the page in the default browser
+        bulk_processes (int): Process pool size for large bulk requests
+        breach_index (BreachIndex): Breached passwords to reject, or None
+        word_list (WordList): Passphrase words (the built-in list if None)
+    """
+    WebPasswordHandler.bulk_processes = bulk_processes
+    children = []
     try:
-        server = HTTPServer(('localhost', port), WebPasswordHandler)
+        server = PooledHTTPServer(('localhost', port), WebPasswordHandler,
+                                  threads=threads, queue_size=queue_size,
+                                  password_gen=PasswordGenerator(breach_index, word_list))
+        
+        # Pre-fork extra processes so CPU-bound generation uses several cores
+        if workers > 1 and not hasattr(os, 'fork'):
+            print("Multiple workers need os.fork; running a single process.")
+            workers = 1
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        
         print(f"🌐 Starting web server at http://localhost:{port}")
+        print(f"   {workers} process(es) x {threads} threads, queue {queue_size}")
         print("Press Ctrl+C to stop the server")
         
         # Open browser automatically
-        def open_browser():
+        def open_browser_later():
             time.sleep(1)  # Wait for server to start
             webbrowser.open(f'http://localhost:{port}')
         
-        browser_thread = threading.Thread(target=open_browser)
-        browser_thread.daemon = True
-        browser_thread.start()
+        if open_browser:
+            browser_thread = threading.Thread(target=open_browser_later)
+            browser_thread.daemon = True
+            browser_thread.start()
         
         server.serve_forever()
         
     except OSError as e:
-        if e.errno == 48:  # Port already in use
+        if e.errno in (48, errno.EADDRINUSE):  # Port already in use
             print(f"Port {port} is already in use. Trying port {port + 1}...")
-            start_web_server(port + 1)
+            start_web_server(port + 1, workers, threads, queue_size, open_browser, bulk_processes,
+                             breach_index, word_list)
         else:
             print(f"Error starting server: {e}")
     except KeyboardInterrupt:
         print("\n\nShutting down web server...")
-        server.shutdown()
+        server.server_close()
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+
+def export_passwords(args):
+    """Non-interactive bulk export for the `bulk` subcommand."""
+    password_gen = PasswordGenerator()
+    batches = password_gen.iter_bulk(
+        args.count,
+        processes=args.processes or os.cpu_count(),
+        length=args.length,
+        include_lowercase=not args.no_lowercase,
+        include_uppercase=not args.no_uppercase,
+        include_numbers=not args.no_numbers,
+        include_symbols=not args.no_symbols,
+        exclude_similar=args.exclude_similar
+    )
+    out = open(args.output, 'wb') if args.output != '-' else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(batches, args.format):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+
+def build_breach_index(args):
+    """Build an index file for the `breach-index` subcommand."""
+    source = open(args.source, 'rb') if args.source != '-' else sys.stdin.buffer
+    try:
+        count = BreachIndex.build(source, args.output, hashed=args.sha1)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+    print(f"Indexed {count} unique passwords into {args.output}", file=sys.stderr)
+
+def build_arg_parser():
+    """Command-line options."""
+    parser = argparse.ArgumentParser(
+        prog='app.py',
+        description='Secure password generator with an interactive CLI and a web interface.',
+        epilog='Without options the interactive command-line interface starts.')
+    parser.add_argument('--web', nargs='?', type=int, const=8080, metavar='PORT',
+                        help='start the web server (default port 8080)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='server processes sharing the port (default 1)')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help=f'worker threads per process (default {DEFAULT_THREADS})')
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f'connections waiting for a thread before 503 (default {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--no-browser', action='store_true',
+                        help='do not open a browser when the server starts')
+    parser.add_argument('--bulk-processes', type=int, default=1, metavar='N',
+                        help=f'process pool for bulk requests of {PARALLEL_MIN_COUNT}+ passwords '
+                             '(default 1 = off, 0 = one per CPU)')
+    parser.add_argument('--breach-index', metavar='FILE',
+                        help='reject generated passwords listed in this index and enable /api/check')
+    parser.add_argument('--wordlist', metavar='FILE',
+                        help='passphrase word list, one word per line (EFF/diceware lists work)')
+    
+    commands = parser.add_subparsers(dest='command')
+    bulk = commands.add_parser('bulk', help='write many passwords to a file or stdout')
+    bulk.add_argument('--count', type=int, default=1000, help='number of passwords (default 1000)')
+    bulk.add_argument('--length', type=int, default=12, help='password length, 4-100 (default 12)')
+    bulk.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='txt',
+                      help='output format (default txt)')
+    bulk.add_argument('--output', '-o', default='-', help='output file, - for stdout (default)')
+    bulk.add_argument('--no-lowercase', action='store_true', help='leave out lowercase letters')
+    bulk.add_argument('--no-uppercase', action='store_true', help='leave out uppercase letters')
+    bulk.add_argument('--no-numbers', action='store_true', help='leave out digits')
+    bulk.add_argument('--no-symbols', action='store_true', help='leave out symbols')
+    bulk.add_argument('--exclude-similar', action='store_true',
+                      help='avoid look-alike characters (i, l, 1, O, 0)')
+    bulk.add_argument('--processes', type=int, default=1,
+                      help='generate on N processes (default 1, 0 = one per CPU)')
+    
+    index = commands.add_parser('breach-index',
+                                help='build a breached-password index from a password list')
+    index.add_argument('source', help='password list, one per line (- for stdin)')
+    index.add_argument('--output', '-o', default='breached.idx',
+                       help='index file to write (default breached.idx)')
+    index.add_argument('--sha1', action='store_true',
+                       help='lines are SHA-1 hex digests (Have I Been Pwned "HASH:count" format)')
+    return parser
 
 def main():
     """Main entry point."""
+    args = build_arg_parser().parse_args()
+    if args.command == 'bulk':
+        # Output may be stdout, so no banner here
+        try:
+            export_passwords(args)
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+        return
+    if args.command == 'breach-index':
+        build_breach_index(args)
+        return
+    
+    breach_index = None
+    if args.breach_index:
+        try:
+            breach_index = BreachIndex(args.breach_index)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Error: cannot open breach index: {e}")
+    word_list = None
+    if args.wordlist:
+        try:
+            word_list = WordList.load(args.wordlist)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            sys.exit(f"Error: cannot load word list: {e}")
+    
     print("🔐 Python Password Generator")
     print("A secure password generator with web interface")
     print("Author: Advanced Password Generator v2.0")
     print("=" * 60)
     
-    if len(sys.argv) > 1:
-        # Command line arguments provided
-        if sys.argv[1] == '--web':
-            port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
-            start_web_server(port)
-        elif sys.argv[1] == '--help':
-            print("Usage:")
-            print("  python password_generator.py          # Interactive CLI")
-            print("  python password_generator.py --web    # Start web server on port 8080")
-            print("  python password_generator.py --web 9000  # Start web server on port 9000")
-            print("  python password_generator.py --help   # Show this help")
-        else:
-            print("Unknown argument. Use --help for usage information.")
+    if args.web is not None:
+        start_web_server(args.web, workers=args.workers, threads=args.threads,
+                         queue_size=args.queue, open_browser=not args.no_browser,
+                         bulk_processes=args.bulk_processes or os.cpu_count(),
+                         breach_index=breach_index, word_list=word_list)
     else:
         # No arguments, run CLI
-        run_command_line_interface()
+        run_command_line_interface(breach_index, word_list)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Bulk generation scaling benchmark.
+Generates the same number of passwords with 1, 2, 4 ... processes (up to the
+CPU count) and prints throughput and speed-up relative to one process.
+
+    python bench_bulk.py --count 2000000 --length 16
+"""
+
+import argparse
+import os
+import time
+
+from app import PasswordGenerator, get_process_pool
+
+def run(password_gen, count, length, processes):
+    """Generate `count` passwords and return the elapsed seconds."""
+    start = time.perf_counter()
+    for _ in password_gen.iter_bulk(count, length=length, processes=processes):
+        pass
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk password generation scaling benchmark.')
+    parser.add_argument('--count', type=int, default=2_000_000, help='passwords per run')
+    parser.add_argument('--length', type=int, default=16, help='password length')
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count(),
+                        help='largest process count to try (default: CPU count)')
+    args = parser.parse_args()
+    
+    steps = [1]
+    while steps[-1] * 2 <= args.max_processes:
+        steps.append(steps[-1] * 2)
+    if steps[-1] != args.max_processes:
+        steps.append(args.max_processes)
+    
+    password_gen = PasswordGenerator()
+    print(f"{args.count:,} passwords of {args.length} characters, {os.cpu_count()} CPUs")
+    print(f"{'processes':>9}  {'seconds':>8}  {'passwords/s':>12}  {'speed-up':>8}")
+    baseline = None
+    for processes in steps:
+        if processes > 1:
+            # Start the workers before timing so spawn cost is not measured
+            run(password_gen, processes * 1000, args.length, processes)
+        elapsed = run(password_gen, args.count, args.length, processes)
+        baseline = baseline or elapsed
+        print(f"{processes:>9}  {elapsed:>8.2f}  {args.count / elapsed:>12,.0f}  {baseline / elapsed:>7.2f}x")
+        if processes > 1:
+            get_process_pool(processes).shutdown()
+
+if __name__ == "__main__":
+    main()
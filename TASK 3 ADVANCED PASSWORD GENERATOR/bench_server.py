@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator for the web server.
+Drives one endpoint from several keep-alive connections and prints
+requests/s and latency percentiles. Starts its own server unless --port
+points at one that is already running.
+
+    python bench_server.py --endpoint generate --connections 16 --duration 10
+    python bench_server.py --port 8080 --endpoint bulk
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ENDPOINTS = {
+    'page': ('GET', '/', None),
+    'generate': ('POST', '/api/generate', {'length': 16}),
+    'bulk': ('POST', '/api/bulk', {'count': 50, 'length': 16}),
+    'passphrase': ('POST', '/api/passphrase', {'word_count': 5}),
+    'strength': ('POST', '/api/strength', {'password': 'Tr0ub4dor&3'}),
+}
+
+def client(host, port, method, path, body, deadline, latencies, errors):
+    """One keep-alive connection sending requests back to back until the deadline."""
+    headers = {'Content-Type': 'application/json'} if body else {}
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def wait_for_server(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit(f"Server on {host}:{port} did not start")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Web server throughput and latency benchmark.')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='generate',
+                        help='endpoint to drive (default generate)')
+    parser.add_argument('--connections', type=int, default=8, help='concurrent connections (default 8)')
+    parser.add_argument('--duration', type=float, default=5, help='seconds to run (default 5)')
+    parser.add_argument('--port', type=int, help='use an already running server on this port')
+    parser.add_argument('--workers', type=int, default=1, help='server processes when starting one')
+    parser.add_argument('--threads', type=int, default=8, help='server threads when starting one')
+    args = parser.parse_args()
+    
+    host = 'localhost'
+    server = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        app = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+        server = subprocess.Popen(
+            [sys.executable, app, '--web', str(port), '--no-browser',
+             '--workers', str(args.workers), '--threads', str(args.threads)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(host, port)
+        method, path, payload = ENDPOINTS[args.endpoint]
+        body = json.dumps(payload).encode('utf-8') if payload else None
+        latencies, errors = [], []
+        deadline = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=client, daemon=True,
+                                    args=(host, port, method, path, body, deadline, latencies, errors))
+                   for _ in range(args.connections)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    
+    if not latencies:
+        sys.exit(f"No successful requests ({len(errors)} errors)")
+    latencies.sort()
+    print(f"{method} {path}: {args.connections} connections for {elapsed:.1f}s")
+    print(f"  requests   {len(latencies):>10,}   errors {len(errors):,}")
+    print(f"  req/s      {len(latencies) / elapsed:>10,.0f}")
+    for label, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99)):
+        print(f"  {label}       {percentile(latencies, fraction) * 1000:>10.2f} ms")
+    print(f"  max        {latencies[-1] * 1000:>10.2f} ms")
+
+if __name__ == "__main__":
+    main()